@@ -1,3 +1,4 @@
 from .synergy_page import SynergyPage
 from .synergy_row import SynergyRow
+from synergy_core.row_evaluation_cache import RowEvaluationCache
 from .backend import Backend
\ No newline at end of file
@@ -0,0 +1,199 @@
+'''
+Headless batch optimizer.
+Reads account states (one json object per line, in the same format as the saved settings file) from a file or stdin,
+runs one optimization method on each of them with a pool of worker processes, and writes one json result per line.
+No QApplication is created, so this can run on machines without a display.
+
+Each input line can also have "method", "page" and "row" keys, which override the command line options for that line.
+The "allocate_across_pages" method splits the BD across pages instead, and needs an "objectives" key on every line,
+with a list of {"page", "method", "row", "weight"} objects (see synergy_core.PageObjective).
+
+States can also be read straight from a profile store (see synergy_core.ProfileStore) with --store, which runs the newest
+state of every profile (or of the ones given with --profiles). Results then also have the "profile" they came from.
+
+With --result-cache, results are kept in an on-disk cache (see synergy_core.ResultCache) shared by every worker, so
+states that were already optimized in an earlier run aren't optimized again.
+
+Example:
+    python batch_optimizer.py accounts.jsonl --method maximize_one_row --page 2 --row 7 --workers 8 > results.jsonl
+    python batch_optimizer.py --store profiles.db --profiles main alt --method flat_up_to_row > results.jsonl
+'''
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from multiprocessing import Pool
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from synergy_core import SynergyModel, PageObjective, ProfileStore, ResultCache
+
+#optimization methods that can be run, and whether or not they need a row
+METHODS = {
+    "maximize_one_row": True,
+    "flat_up_to_row": True,
+    "min_tick_row_flat_below": True,
+    "see_maximization_one_page": False,
+    "see_min_tick_one_page": False,
+    "maximize_energy_on_page": False,
+}
+ALLOCATE_METHOD = "allocate_across_pages"
+#each worker process opens the result cache once, see get_result_cache
+result_caches = {}
+
+
+def get_result_cache(path:str) -> ResultCache:
+    if path not in result_caches:
+        result_caches[path] = ResultCache(path)
+    return result_caches[path]
+
+
+def run_state(job:Tuple[int, str, dict]) -> dict:
+    '''
+    Runs a single optimization in a worker process.
+    Params:
+        job: tuple of (line number, input line, default options)
+    Returns:
+        result: dictionary of the line number, the method run, the resulting bd, gains/tick and synergy energy/tick,
+            whether the optimization finished inside its budget, and the run's stats (see synergy_core.RunStats).
+            If the line couldn't be run, this has an "error" key instead of the results
+    '''
+    line_number, line, options = job
+    try:
+        state = json.loads(line)
+        method = state.get("method", options["method"])
+        page = int(state.get("page", options["page"]))
+        row = int(state.get("row", options["row"]))
+        if method not in METHODS and method != ALLOCATE_METHOD:
+            raise ValueError(f"Unknown method {method}")
+        backend = SynergyModel.from_state_dict(state)
+        backend.verbose = options["verbose"]
+        backend.profile_directory = options["profile_dir"]
+        if options["result_cache"] is not None:
+            backend.result_cache = get_result_cache(options["result_cache"])
+        #anything the optimizers print would mix into the results on stdout
+        output = sys.stderr if options["verbose"] else io.StringIO()
+        budget = {"time_budget": options["time_budget"], "max_evaluations": options["max_evaluations"]}
+        if method == ALLOCATE_METHOD:
+            return add_profile(run_allocation(line_number, state, backend, output), state)
+        with contextlib.redirect_stdout(output):
+            if METHODS[method]:
+                bd, gains_tick, syn_energy = getattr(backend, method)(page, row, **budget)
+            else:
+                bd, gains_tick, syn_energy = getattr(backend, method)(page, **budget)
+        return add_profile({
+            "line": line_number,
+            "method": method,
+            "page": page,
+            "row": row if METHODS[method] else None,
+            "bd": np.asarray(bd).tolist(),
+            "gains per tick": np.asarray(gains_tick, dtype=float).tolist(),
+            "synergy energy per tick": float(syn_energy),
+            "converged": backend.last_result.converged,
+            "stats": backend.last_run_stats.to_dict(),
+        }, state)
+    except Exception as e:
+        return {"line": line_number, "error": f"{type(e).__name__}: {e}"}
+
+
+def add_profile(result:dict, state:dict) -> dict:
+    if "profile" in state:
+        result["profile"] = state["profile"]
+    return result
+
+
+def run_allocation(line_number:int, state:dict, backend:SynergyModel, output) -> dict:
+    '''
+    Runs allocate_across_pages for a single line, and returns the BD given to each page and each page's results
+    '''
+    objectives = [PageObjective(**objective) for objective in state["objectives"]]
+    with contextlib.redirect_stdout(output):
+        allocation = backend.allocate_across_pages(objectives)
+    pages = {}
+    for page, (bd, gains_tick, syn_energy) in allocation.results.items():
+        pages[str(page)] = {
+            "bd": np.asarray(bd).tolist(),
+            "gains per tick": np.asarray(gains_tick, dtype=float).tolist(),
+            "synergy energy per tick": float(syn_energy),
+        }
+    return {
+        "line": line_number,
+        "method": ALLOCATE_METHOD,
+        "split": {str(page): bd for page, bd in allocation.split.items()},
+        "pages": pages,
+        "score": allocation.score,
+        "stats": backend.last_run_stats.to_dict(),
+    }
+
+
+def read_jobs(input_file, options:dict) -> Iterator[Tuple[int, str, dict]]:
+    '''
+    Yields every non-empty line of the input with its line number, so the input is streamed instead of read in at once
+    '''
+    for line_number, line in enumerate(input_file, start=1):
+        if line.strip():
+            yield line_number, line, options
+
+
+def read_store_jobs(store:ProfileStore, profiles, options:dict) -> Iterator[Tuple[int, str, dict]]:
+    '''
+    Yields the newest state of every profile in a store (or of the given ones) as a job, numbered from 1
+    '''
+    for line_number, snapshot in enumerate(store.iterate_latest(profiles), start=1):
+        yield line_number, json.dumps({"profile": snapshot.profile, **snapshot.state}), options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs synergy optimizations on many account states without the GUI")
+    parser.add_argument("input", nargs="?", default="-", help="jsonl file of account states, or - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="jsonl file to write results to, or - for stdout")
+    parser.add_argument("--method", "-m", default="maximize_one_row", choices=list(METHODS) + [ALLOCATE_METHOD],
+                        help="optimization method to run")
+    parser.add_argument("--page", "-p", type=int, default=1, choices=[1, 2, 3], help="page of synergy to optimize")
+    parser.add_argument("--row", "-r", type=int, default=7, choices=range(1, 8), help="row of synergy to optimize")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=16, help="number of states sent to a worker at a time")
+    parser.add_argument("--time-budget", type=float, default=None, help="most seconds to spend on each state")
+    parser.add_argument("--max-evaluations", type=int, default=None, help="most optimizer steps to run on each state")
+    parser.add_argument("--verbose", "-v", action="store_true", help="print a summary of every run to stderr")
+    parser.add_argument("--store", default=None, help="profile store to read states from, instead of the input")
+    parser.add_argument("--profiles", nargs="+", default=None, help="profiles of the store to run, instead of all of them")
+    parser.add_argument("--result-cache", default=None, help="on-disk cache of results to reuse and add to")
+    parser.add_argument("--profile-dir", default=None, help="profile every run with cProfile, and write the profiles here")
+    args = parser.parse_args(argv)
+
+    options = {"method": args.method, "page": args.page, "row": args.row, "verbose": args.verbose,
+               "time_budget": args.time_budget, "max_evaluations": args.max_evaluations,
+               "profile_dir": args.profile_dir, "result_cache": args.result_cache}
+    store = ProfileStore(args.store) if args.store is not None else None
+    input_file = sys.stdin if args.input == "-" or store is not None else open(args.input, encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        if store is not None:
+            jobs = read_store_jobs(store, args.profiles, options)
+        else:
+            jobs = read_jobs(input_file, options)
+        if args.workers <= 1:
+            results = map(run_state, jobs)
+            for result in results:
+                output_file.write(json.dumps(result) + "\n")
+        else:
+            with Pool(args.workers) as pool:
+                #imap keeps the results in the same order as the input
+                for result in pool.imap(run_state, jobs, chunksize=args.chunksize):
+                    output_file.write(json.dumps(result) + "\n")
+        output_file.flush()
+    finally:
+        if store is not None:
+            store.close()
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+'''
+Benchmark suite for the optimizers.
+Runs every optimization method on all 3 pages, sweeping the number of BD and the row levels, and writes the wall time,
+page evaluations, row evaluations and peak memory of each run to a json file. A previous results file can be passed
+with --compare, to print how much each case sped up or slowed down.
+
+Every case is run on a freshly built SynergyModel, so the tick ladders and row cache start out cold each time.
+Times are the best of --repeat runs, and peak memory is measured in one extra run with tracemalloc on, since tracing
+slows everything down.
+
+Example:
+    python benchmark_optimizers.py --output before.json
+    python benchmark_optimizers.py --output after.json --compare before.json
+'''
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from synergy_core import SynergyModel
+
+#optimization methods to benchmark, and whether or not they need a row
+METHODS = {
+    "maximize_one_row": True,
+    "flat_up_to_row": True,
+    "min_tick_row_flat_below": True,
+    "see_maximization_one_page": False,
+    "see_min_tick_one_page": False,
+    "maximize_energy_on_page": False,
+}
+BD_COUNTS = [40, 1000, 10000, 100000, 1000000]
+#row levels from a brand new page up to late game, from row 1 to row 7
+LEVEL_PROFILES = {
+    "level 1": [1] * 7,
+    "level 100": [100] * 7,
+    "level 10000": [10000] * 7,
+    "high progress": [200000, 120000, 80000, 50000, 30000, 15000, 8000],
+}
+BENCHMARK_ROW = 7
+#time ratios above this are flagged when comparing against a previous run
+REGRESSION_THRESHOLD = 1.2
+
+
+def build_model(levels:List[int], bd:int) -> SynergyModel:
+    return SynergyModel(levels, levels, levels, [0]*7, [0]*7, [0]*7, bd, {})
+
+
+def run_case(method:str, page:int, levels:List[int], bd:int) -> SynergyModel:
+    '''
+    Runs a single optimization on a new model, and returns the model so its evaluation counts can be read
+    '''
+    model = build_model(levels, bd)
+    model.verbose = False
+    #compare_maximize_solvers style warnings would flood the output
+    with contextlib.redirect_stdout(io.StringIO()):
+        if METHODS[method]:
+            getattr(model, method)(page, BENCHMARK_ROW)
+        else:
+            getattr(model, method)(page)
+    return model
+
+
+def iterate_cases(methods:List[str], bd_counts:List[int], profiles:List[str]) -> Iterator[Dict]:
+    for method in methods:
+        for page in [1, 2, 3]:
+            for profile in profiles:
+                for bd in bd_counts:
+                    yield {"method": method, "page": page, "levels": profile, "bd": bd}
+
+
+def benchmark_case(case:Dict, repeat:int) -> Dict:
+    '''
+    Returns the case with its best wall time (s), page evaluations, row evaluations, peak memory (bytes), and the rest of
+    the counters and phase times from the run's RunStats added
+    '''
+    levels = LEVEL_PROFILES[case["levels"]]
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        run_case(case["method"], case["page"], levels, case["bd"])
+        times.append(time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    model = run_case(case["method"], case["page"], levels, case["bd"])
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    run_stats = model.last_run_stats
+
+    result = dict(case)
+    result["time s"] = min(times)
+    result["page evaluations"] = run_stats.counters["page evaluations"]
+    result["row evaluations"] = run_stats.counters["row evaluations"]
+    result["peak memory bytes"] = peak_memory
+    result["counters"] = run_stats.counters
+    result["phase times s"] = run_stats.phase_times
+    return result
+
+
+def case_key(result:Dict) -> tuple:
+    return result["method"], result["page"], result["levels"], result["bd"]
+
+
+def compare_results(results:List[Dict], previous_results:List[Dict]):
+    '''
+    Prints the time ratio (new/old) of every case that is in both runs, and flags the ones that got slower
+    '''
+    previous = {case_key(result): result for result in previous_results}
+    ratios = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        ratio = result["time s"] / max(old["time s"], 1e-9)
+        ratios.append(ratio)
+        flag = "  <-- slower" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{result['method']:>26} page {result['page']} {result['levels']:>13} {result['bd']:>8} BD: "
+              f"{old['time s']:.4f} s -> {result['time s']:.4f} s ({ratio:.2f}x){flag}")
+    if ratios:
+        print(f"Geometric mean time ratio over {len(ratios)} cases: {np.exp(np.mean(np.log(ratios))):.3f}")
+
+
+def main(argv:Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmarks the synergy optimizers across BD counts and row levels")
+    parser.add_argument("--output", "-o", default="benchmark_results.json", help="json file to write results to")
+    parser.add_argument("--compare", "-c", default=None, help="previous results file to compare against")
+    parser.add_argument("--methods", "-m", nargs="+", default=list(METHODS), choices=list(METHODS), help="methods to run")
+    parser.add_argument("--bd", nargs="+", type=int, default=BD_COUNTS, help="BD counts to sweep")
+    parser.add_argument("--levels", nargs="+", default=list(LEVEL_PROFILES), choices=list(LEVEL_PROFILES),
+                        help="row level profiles to sweep")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="number of timed runs per case, the best one is kept")
+    args = parser.parse_args(argv)
+
+    results = []
+    for case in iterate_cases(args.methods, args.bd, args.levels):
+        result = benchmark_case(case, args.repeat)
+        results.append(result)
+        print(f"{result['method']:>26} page {result['page']} {result['levels']:>13} {result['bd']:>8} BD: "
+              f"{result['time s']:.4f} s, {result['page evaluations']} page evals, {result['row evaluations']} row evals, "
+              f"{result['peak memory bytes'] / 1024:.0f} KiB", file=sys.stderr)
+
+    dump = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(dump, output_file, indent=4)
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as previous_file:
+            compare_results(results, json.load(previous_file)["results"])
+
+
+if __name__ == "__main__":
+    main()
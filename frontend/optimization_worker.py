@@ -0,0 +1,77 @@
+import time
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+from synergy_core import OptimizationCancelled, SynergyModel
+
+class OptimizationSignals(QObject):
+    '''
+    Signals for an OptimizationWorker. QRunnable isn't a QObject, so these live on their own object
+    '''
+    progress = Signal(int, int, float) #emits job id, iterations, current best gains/tick
+    finished = Signal(int, object, object) #emits job id, (bd, gains_tick, syn_energy) tuple from the optimizer, RunStats of the run
+    cancelled = Signal(int) #emits job id
+    failed = Signal(int, str) #emits job id, error message
+
+class OptimizationWorker(QRunnable):
+    '''
+    Runs a single optimization off of the GUI thread.
+    The optimization runs on a snapshot of the model (see SynergyModel.get_snapshot) that nothing else touches,
+    so the inputs can keep being edited while it runs. The GUI thread brings the results back once it finishes.
+    Progress is reported through the snapshot's progress callback, at most every progress_interval seconds,
+    and cancel() makes the optimizer stop at its next progress report
+
+    Params:
+        ----
+        job_id: id to tag every signal with, so results from superseded runs can be told apart
+        model: snapshot the optimization runs on
+        optimization: name of the model's optimization function to run, i.e. "maximize_one_row"
+        args: arguments to pass to the function
+    '''
+
+    def __init__(self, job_id:int, model:SynergyModel, optimization:str, *args, progress_interval:float = 0.1, **kwargs):
+        super().__init__()
+        self.job_id = job_id
+        self.model = model
+        self.optimization = optimization
+        self.args = args
+        self.kwargs = kwargs
+        self.progress_interval = progress_interval
+        self.signals = OptimizationSignals()
+        self._cancel_event = threading.Event()
+        self._last_progress_time = 0
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def progress_callback(self, iterations:int, best_gains:float) -> bool:
+        if self._cancel_event.is_set():
+            return False
+        now = time.time()
+        if now - self._last_progress_time > self.progress_interval:
+            self._last_progress_time = now
+            self.signals.progress.emit(self.job_id, iterations, float(best_gains))
+        return True
+
+    def run(self):
+        if self._cancel_event.is_set():
+            self.signals.cancelled.emit(self.job_id)
+            return
+        self.model.progress_callback = self.progress_callback
+        try:
+            result = getattr(self.model, self.optimization)(*self.args, **self.kwargs)
+        except OptimizationCancelled:
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, f"{type(e).__name__}: {e}")
+        else:
+            #a cancel that comes in after the optimizer's last progress report still throws the result away
+            if self._cancel_event.is_set():
+                self.signals.cancelled.emit(self.job_id)
+            else:
+                self.signals.finished.emit(self.job_id, result, self.model.last_run_stats)
+        finally:
+            self.model.progress_callback = None
@@ -1,9 +1,12 @@
 from PySide6.QtWidgets import QWidget, QLabel, QSpinBox, QHBoxLayout, QDoubleSpinBox, QPushButton, QGridLayout, QCheckBox, QGroupBox, QRadioButton, QButtonGroup,\
         QComboBox
 from PySide6.QtGui import QRegularExpressionValidator
+from PySide6.QtCore import QThreadPool
 from backend import Backend
+from synergy_core import RunStats, SynergyModel
 from frontend.synergy_page_widget import SynergyPageWidget
-from typing import List
+from frontend.optimization_worker import OptimizationWorker
+from typing import List, Optional
 import numpy as np
 
 class OptimizerWidget(QWidget):
@@ -14,6 +17,11 @@ class OptimizerWidget(QWidget):
         super().__init__()
 
         self.backend = backend
+        #optimizations run one at a time off of the GUI thread, each on its own snapshot of the model
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+        self.job_id = 0 #id of the latest optimization, anything older is thrown away
+        self.current_worker:Optional[OptimizationWorker] = None
 
         self.create_widgets()
         self.connect_signals()
@@ -44,6 +52,9 @@ class OptimizerWidget(QWidget):
         self.hours_entry.setValue(24)
 
         self.run_button = QPushButton("Run Optimization")
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.status_label = QLabel("")
 
         self.method_group = QButtonGroup()
         self.method_group.setExclusive(True)
@@ -72,7 +83,8 @@ class OptimizerWidget(QWidget):
         setup_layout.addWidget(self.row_dropdown,1,1)
         setup_layout.addWidget(self.hours_label,2,0)
         setup_layout.addWidget(self.hours_entry,2,1)
-        setup_layout.addWidget(self.run_button,3,0,1,2)
+        setup_layout.addWidget(self.run_button,3,0)
+        setup_layout.addWidget(self.cancel_button,3,1)
         setup_layout.addWidget(self.method_label,4,0,1,2)
         setup_layout.addWidget(self.max_button,5,0,1,2)
         setup_layout.addWidget(self.flat_button,6,0,1,2)
@@ -80,6 +92,7 @@ class OptimizerWidget(QWidget):
         setup_layout.addWidget(self.min_flat_below_button,8,0,1,2)
         setup_layout.addWidget(self.min_page_button, 9,0,1,2)
         setup_layout.addWidget(self.max_energy_button, 10,0,1,2)
+        setup_layout.addWidget(self.status_label, 11,0,1,2)
 
         #now we display the results of the script optimization
         self.results_groupbox = QGroupBox("Optimization Results")
@@ -170,6 +183,7 @@ class OptimizerWidget(QWidget):
     def connect_signals(self):
         self.page_dropdown.currentTextChanged.connect(self.update_row_displays)
         self.run_button.clicked.connect(self.run_optimization)
+        self.cancel_button.clicked.connect(self.cancel_optimization)
     
     def update_row_displays(self, new_page:str):
         '''
@@ -182,25 +196,82 @@ class OptimizerWidget(QWidget):
 
     def run_optimization(self):
         '''
-        Actually runs the optimization
+        Actually runs the optimization, on a background worker
         '''
         selected_button = self.method_group.checkedButton()
         page = int(self.page_dropdown.currentText())
         row = int(self.row_dropdown.currentText())
         if selected_button == self.max_button:
-            bd, gains_tick, syn_energy = self.backend.maximize_one_row(page, row)
+            self.start_optimization(page, "maximize_one_row", page, row)
         elif selected_button == self.flat_button:
-            bd, gains_tick, syn_energy = self.backend.flat_up_to_row(page, row)
+            self.start_optimization(page, "flat_up_to_row", page, row)
         elif selected_button == self.max_page_button:
-            bd, gains_tick, syn_energy = self.backend.see_maximization_one_page(page)
+            self.start_optimization(page, "see_maximization_one_page", page, simulate=False)
         elif selected_button == self.min_flat_below_button:
-            bd, gains_tick, syn_energy = self.backend.min_tick_row_flat_below(page, row)
+            self.start_optimization(page, "min_tick_row_flat_below", page, row)
         elif selected_button == self.min_page_button:
-            bd, gains_tick, syn_energy = self.backend.see_min_tick_one_page(page)
+            self.start_optimization(page, "see_min_tick_one_page", page, simulate=False)
         elif selected_button == self.max_energy_button:
-            bd, gains_tick, syn_energy = self.backend.maximize_energy_on_page(page)
+            self.start_optimization(page, "maximize_energy_on_page", page)
 
-        self.update_results(bd, gains_tick, syn_energy)
+    def start_optimization(self, page:int, optimization:str, *args, simulate:bool = True):
+        '''
+        Submits an optimization (the name of a model function) to the thread pool. It runs on a snapshot of the current
+        inputs, so editing them while it runs doesn't change the run. Any optimization that is still running gets
+        cancelled, and its results are ignored.
+        simulate is passed through to update_results, and should be False for the page overviews, since they give each
+        row its own result rather than one distribution that can be simulated
+        '''
+        if self.current_worker is not None:
+            self.current_worker.cancel()
+        self.job_id += 1
+        snapshot = self.backend.model.get_snapshot()
+        worker = OptimizationWorker(self.job_id, snapshot, optimization, *args)
+        worker.signals.progress.connect(self.update_progress)
+        worker.signals.finished.connect(lambda job_id, result, run_stats: self.finish_optimization(job_id, page, result, run_stats,
+                                                                                                  simulate, snapshot))
+        worker.signals.cancelled.connect(lambda job_id: self.end_optimization(job_id, "Optimization cancelled"))
+        worker.signals.failed.connect(lambda job_id, message: self.end_optimization(job_id, f"Optimization failed: {message}"))
+        self.current_worker = worker
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText("Running optimization...")
+        self.thread_pool.start(worker)
+
+    def cancel_optimization(self):
+        if self.current_worker is not None:
+            self.current_worker.cancel()
+
+    def update_progress(self, job_id:int, iterations:int, best_gains:float):
+        if job_id != self.job_id:
+            return
+        self.status_label.setText(f"Running optimization... {iterations} iterations, best gains/hour {self.text_helper(best_gains*36000)}")
+
+    def finish_optimization(self, job_id:int, page:int, result:tuple, run_stats:Optional[RunStats] = None, simulate:bool = True,
+                            snapshot:Optional[SynergyModel] = None):
+        '''
+        Fills in the results once an optimization completes, unless a newer one has been started since.
+        The results found on the snapshot are kept by the backend, and the projections use the snapshot's inputs,
+        since those are the ones the results were found for.
+        The status label shows the stats of the run
+        '''
+        if job_id != self.job_id:
+            return
+        if snapshot is not None:
+            self.backend.model.merge_snapshot(snapshot)
+        bd, gains_tick, syn_energy = result
+        self.update_results(bd, gains_tick, syn_energy, page, simulate, snapshot)
+        message = "Optimization finished"
+        if run_stats is not None:
+            message += f" in {run_stats.total_time:.3f} s, {run_stats.counters.get('row evaluations', 0)} row evaluations, " \
+                f"{run_stats.counters.get('cache hits', 0)} cache hits"
+        self.end_optimization(job_id, message)
+
+    def end_optimization(self, job_id:int, message:str):
+        if job_id != self.job_id:
+            return
+        self.current_worker = None
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(message)
     
     def text_helper(self, value:float) -> str:
         '''
@@ -213,22 +284,35 @@ class OptimizerWidget(QWidget):
         else:
             return f"{value:.3f}"
 
-    def update_results(self, bd:List[int], gains_tick:List[float], syn_energy:float):
+    def update_results(self, bd:List[int], gains_tick:List[float], syn_energy:float, page:Optional[int] = None, simulate:bool = True,
+                       model:Optional[SynergyModel] = None):
         '''
-        standaridzed function to upadte the displays after an optimization runs
+        standaridzed function to upadte the displays after an optimization runs.
+        page is the page that was optimized, and defaults to the currently selected one.
+        model is the one the optimization ran on, and defaults to the backend's.
+        If simulate is True, the final points and bonus come from the horizon simulation, which accounts for levels going
+        up as the rows fill, otherwise they just use the gains/hour
         '''
         optimized_rows = len(bd)
-        selected_page=  int(self.page_dropdown.currentText())
+        selected_page=  int(self.page_dropdown.currentText()) if page is None else page
+        model = self.backend.model if model is None else model
+        synergy_page = model.synergy_pages[selected_page]
+        if simulate:
+            trajectory = model.simulate_horizon(selected_page, list(bd), self.hours_entry.value(), samples=2)
         for i in range(7):
             if i < optimized_rows:
                 self.bd_widgets[i].setText(f"{bd[i]:d}")
                 gain_hour = gains_tick[i]*36000
                 self.gains_hour_widgets[i].setText(self.text_helper(gain_hour))
-                final_points = gain_hour * self.hours_entry.value() + self.backend.synergy_pages[selected_page].synergy_rows[i+1].current_points
+                if simulate:
+                    final_points = trajectory.points[i, -1]
+                    final_bonus = trajectory.bonus[i, -1]
+                else:
+                    final_points = gain_hour * self.hours_entry.value() + synergy_page.synergy_rows[i+1].current_points
+                    final_bonus = synergy_page.synergy_rows[i+1].calculate_bonus(final_points)
                 self.final_points_widgets[i].setText(self.text_helper(final_points))
-                final_bonus = self.backend.synergy_pages[selected_page].synergy_rows[i+1].calculate_bonus(final_points)
                 self.final_bonus_widgets[i].setText(self.text_helper(final_bonus))
-                current_bonus = self.backend.synergy_pages[selected_page].synergy_rows[i+1].current_bonus
+                current_bonus = synergy_page.synergy_rows[i+1].current_bonus
                 relative_gains = final_bonus/current_bonus
                 self.rel_gains_widgets[i].setText(f"x{relative_gains:.2f}")
             else:
@@ -0,0 +1,11 @@
+from .row_evaluation_cache import RowEvaluationCache
+from .run_stats import RunStats
+from .horizon import FillSchedule, HorizonTrajectory, ReassignmentStep, ReassignmentPlan
+from .page_allocation import PageObjective, ResponseCurve, PageAllocation
+from .pareto import FrontierPoint
+from .profile_store import ProfileStore, Snapshot
+from .result_cache import ResultCache
+from .what_if import WhatIfResult
+from .synergy_row import SynergyRow, TickLadder
+from .synergy_page import SynergyPage
+from .synergy_model import SynergyModel, OptimizationCancelled, OptimizationResult, SweepPoint, TargetResult
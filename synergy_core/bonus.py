@@ -0,0 +1,68 @@
+from typing import Tuple
+
+import numpy as np
+
+from synergy_core.synergy_row import SynergyRow
+
+LOG_1000 = np.log(1000)
+
+
+def get_bonus_parameters() -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Returns the divisor and log scaling of every row (see SynergyRow.calculate_bonus), as arrays of shape (3, 7),
+    with one line per page
+    '''
+    divisors = np.array([SynergyRow.bonus_divisors_dict[page] for page in range(1, 4)], dtype=float)
+    log_scalings = np.tile(np.array(SynergyRow.log_scaling_array, dtype=float), (3, 1))
+    return divisors, log_scalings
+
+
+def calculate_bonus_array(points:np.ndarray, divisor, log_scaling) -> np.ndarray:
+    '''
+    Vectorized SynergyRow.calculate_bonus, for any number of points at once. The divisor and log scaling broadcast
+    against the points, so this can do every row of a page (shape (7, 1)) or every page (shape (3, 7, 1)) in one call.
+    This uses the same formula as calculate_bonus, so results match it to within the last bit
+    '''
+    points = np.asarray(points, dtype=float)
+    linear = points/1000/divisor + 1
+    #the log branch is only used above 1000 points, so anything below is clipped to keep the log finite
+    logarithmic = np.float_power(2, np.log(np.maximum(points, 1000)/1000)/np.log(log_scaling))/divisor + 1
+    return np.where(points <= 1000, linear, logarithmic)
+
+
+def calculate_log_bonus(log_points:np.ndarray, divisor, log_scaling) -> np.ndarray:
+    '''
+    Log domain version of calculate_bonus_array. Takes the natural log of the points and returns the natural log of
+    the multiplicative bonus, so it keeps working with points far past what a float can hold (about 1e308),
+    i.e. from summing log gains over a long projection. Only positive points have a log, so -inf means 0 points.
+    Above 1000 points, log(bonus - 1) = log(points/1000) * log(2) / log(log_scaling) - log(divisor), which is exact
+    in the log domain, and log(bonus) is then log(1 + exp(that)), done with logaddexp so it doesn't overflow
+    '''
+    log_points = np.asarray(log_points, dtype=float)
+    log_divisor = np.log(divisor)
+    linear = log_points - LOG_1000 - log_divisor
+    logarithmic = (np.maximum(log_points, LOG_1000) - LOG_1000) * np.log(2)/np.log(log_scaling) - log_divisor
+    return np.logaddexp(0, np.where(log_points <= LOG_1000, linear, logarithmic))
+
+
+def calculate_points_for_bonus_array(bonus:np.ndarray, divisor, log_scaling) -> np.ndarray:
+    '''
+    Vectorized SynergyRow.calculate_points_for_bonus
+    '''
+    scaled_bonus = (np.asarray(bonus, dtype=float) - 1) * divisor
+    logarithmic = 1000 * np.float_power(log_scaling, np.log2(np.maximum(scaled_bonus, 1)))
+    return np.where(scaled_bonus <= 1, scaled_bonus * 1000, logarithmic)
+
+
+def calculate_all_bonuses(points:np.ndarray, log_domain:bool = False) -> np.ndarray:
+    '''
+    Bonus of every row of every page at once, for points of shape (3, 7, ...), with any number of samples
+    per row in the trailing dimensions (i.e. a curve of points for each row).
+    With log_domain, points are natural logs and so is the result, see calculate_log_bonus
+    '''
+    points = np.asarray(points, dtype=float)
+    divisors, log_scalings = get_bonus_parameters()
+    shape = (3, 7) + (1,) * (points.ndim - 2)
+    if log_domain:
+        return calculate_log_bonus(points, divisors.reshape(shape), log_scalings.reshape(shape))
+    return calculate_bonus_array(points, divisors.reshape(shape), log_scalings.reshape(shape))
@@ -0,0 +1,177 @@
+import math
+from typing import List, NamedTuple
+
+import numpy as np
+
+
+class FillSegment(NamedTuple):
+    '''
+    Run of fills of a single row where the time each fill takes follows one simple formula.
+    Either every fill takes the same number of ticks (speed capped, or the progress requirement is at its minimum),
+    or the requirement drops by the same amount every fill, so the fill times go down linearly
+    '''
+    start_ticks: float #tick the first fill of the segment starts at
+    start_fill: int #number of fills done before this segment
+    fills: float #number of fills in the segment, inf for the last one
+    start_progress: float #progress requirement of the first fill of the segment
+    progress_step: float #how much the requirement drops every fill, 0 if it doesn't change
+    capped_ticks: int #ticks every fill takes if speed capped, 0 if not speed capped
+
+
+class HorizonTrajectory(NamedTuple):
+    '''
+    Result of SynergyPage.simulate_horizon. Every array has one line per row, starting at row 1,
+    and one column per sample time
+    '''
+    ticks: np.ndarray #sample times, in ticks
+    points: np.ndarray #points of each row
+    bonus: np.ndarray #multiplicative bonus of each row, see SynergyRow.calculate_bonus
+    levels: np.ndarray #level of each row
+    fills: np.ndarray #number of times each row has filled since the start
+    syn_energy: np.ndarray #total synergy energy gained since the start, one value per sample time
+
+
+class ReassignmentStep(NamedTuple):
+    '''
+    One distribution of a ReassignmentPlan, kept from its start until the next step starts
+    '''
+    hours: float #hours from now the distribution starts at
+    bd_array: np.ndarray #bd distribution, for all 7 rows
+    gains_array: np.ndarray #gains/tick of every row, at the levels the page is projected to have when it starts
+    syn_energy: float #synergy energy gained per tick, at those levels
+
+
+class ReassignmentPlan(NamedTuple):
+    '''
+    Result of SynergyModel.plan_reassignments
+    '''
+    steps: List[ReassignmentStep] #distributions to use, in order. Reassignments that keep the same one are left out
+    trajectory: HorizonTrajectory #projection of the whole plan, with fills and syn_energy counted from the start
+    value: float #objective value at the end of the plan, see SynergyModel.score_trajectory
+    static_value: float #objective value at the end if the first static optimum was kept the whole time
+    feasible: bool #True if no row is projected to go below 0 points (or below where it started, if it started below 0)
+
+
+class FillSchedule:
+    '''
+    Closed form schedule of when a single row fills, for a fixed number of BD and progress multiplier.
+    Every fill gives the row round(level * power) points and takes 2x its level from the row before it, and
+    (with level ups on) raises the level by 1, which lowers the progress requirement by 10 until it hits its minimum.
+    So fill times only change when the requirement crosses a speed cap tier or hits the minimum, and the schedule is
+    split into at most 12 segments (see FillSegment), which can each be counted through in O(1)
+
+    Params:
+        ----
+        level: starting level of the row
+        current_progress: starting progress requirement of the row
+        min_progress: smallest the progress requirement can get
+        points_per_tick: BD on the row times the progress multiplier
+        level_ups: whether or not every fill raises the level by 1
+    '''
+    __slots__ = ("level", "level_step", "points_per_tick", "segments")
+
+    def __init__(self, level:int, current_progress:float, min_progress:float, points_per_tick:float, level_ups:bool = True):
+        self.level = level
+        self.level_step = 1 if level_ups else 0
+        self.points_per_tick = points_per_tick
+        self.segments:List[FillSegment] = []
+        if points_per_tick > 0:
+            self.build_segments(current_progress, min_progress)
+
+    def build_segments(self, current_progress:float, min_progress:float):
+        step = 10 * self.level_step
+        f = self.points_per_tick
+        fill = 0
+        start_ticks = 0.0
+        while True:
+            unfloored = current_progress - step * fill
+            progress = max(min_progress, unfloored)
+            at_floor = step == 0 or unfloored <= min_progress
+            if not at_floor:
+                floor_fill = math.ceil((current_progress - min_progress) / step)
+            if progress >= 10 * f:
+                #not speed capped, so each fill takes progress / f ticks
+                capped_ticks = 0
+                if not at_floor:
+                    end_fill = min(math.floor((current_progress - 10 * f) / step) + 1, floor_fill)
+            else:
+                capped_ticks = math.ceil(progress / f)
+                if not at_floor:
+                    end_fill = min(math.ceil((current_progress - (capped_ticks - 1) * f) / step), floor_fill)
+            fills = math.inf if at_floor else end_fill - fill
+            segment_step = 0 if at_floor or capped_ticks else step
+            segment = FillSegment(start_ticks, fill, fills, progress, segment_step, capped_ticks)
+            self.segments.append(segment)
+            if at_floor:
+                break
+            start_ticks += self.segment_ticks(segment, fills)
+            fill = end_fill
+
+    def segment_ticks(self, segment:FillSegment, fills:float) -> float:
+        '''
+        Ticks it takes to do the first fills of a segment
+        '''
+        if segment.capped_ticks:
+            return segment.capped_ticks * fills
+        return (fills * segment.start_progress - segment.progress_step * fills * (fills - 1) / 2) / self.points_per_tick
+
+    def fills_at(self, ticks:np.ndarray) -> np.ndarray:
+        '''
+        Returns how many fills are done by each of the given times (in ticks)
+        '''
+        ticks = np.asarray(ticks, dtype=float)
+        fills = np.zeros(ticks.shape)
+        for segment in self.segments:
+            in_segment = ticks >= segment.start_ticks
+            if not np.any(in_segment):
+                break
+            elapsed = ticks[in_segment] - segment.start_ticks
+            if segment.capped_ticks:
+                segment_fills = np.floor(elapsed / segment.capped_ticks)
+            elif segment.progress_step == 0:
+                segment_fills = np.floor(elapsed * self.points_per_tick / segment.start_progress)
+            else:
+                #largest n where (n * start - step * n * (n-1) / 2) / f <= elapsed, which is the smaller root of a quadratic
+                a = segment.progress_step / 2
+                b = segment.start_progress + a
+                discriminant = np.maximum(b**2 - 4 * a * self.points_per_tick * elapsed, 0)
+                segment_fills = np.floor((b - np.sqrt(discriminant)) / (2 * a))
+            fills[in_segment] = segment.start_fill + np.minimum(segment_fills, segment.fills)
+        return fills
+
+    def ticks_for(self, fills:np.ndarray) -> np.ndarray:
+        '''
+        Returns how many ticks the first fills take, the inverse of fills_at. inf if the row never gets there
+        '''
+        fills = np.asarray(fills, dtype=float)
+        ticks = np.where(fills <= 0, 0.0, np.inf)
+        for segment in self.segments:
+            in_segment = (fills > segment.start_fill) & np.isfinite(fills)
+            if not np.any(in_segment):
+                break
+            segment_fills = np.minimum(fills[in_segment] - segment.start_fill, segment.fills)
+            ticks[in_segment] = segment.start_ticks + self.segment_ticks(segment, segment_fills)
+        return ticks
+
+    def level_sum(self, fills:np.ndarray) -> np.ndarray:
+        '''
+        Returns the sum of the levels the row was at for each of its first fills
+        '''
+        return fills * self.level + self.level_step * fills * (fills - 1) / 2
+
+    def fills_for_level_sum(self, level_sum:np.ndarray) -> np.ndarray:
+        '''
+        Returns the most fills whose levels add up to at most level_sum, the inverse of level_sum
+        '''
+        level_sum = np.maximum(np.asarray(level_sum, dtype=float), 0)
+        if self.level_step == 0:
+            if self.level == 0:
+                return np.full(level_sum.shape, np.inf)
+            fills = np.floor(level_sum / self.level)
+        else:
+            #largest n where n * level + n * (n-1) / 2 <= level_sum, which is the larger root of a quadratic
+            b = self.level - .5
+            fills = np.floor(np.sqrt(b**2 + 2 * level_sum) - b)
+        #the square root can round up past an integer
+        fills = fills - (self.level_sum(fills) > level_sum)
+        return np.maximum(fills, 0)
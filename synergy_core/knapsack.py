@@ -0,0 +1,99 @@
+from typing import List, NamedTuple
+
+import numpy as np
+
+
+class Frontier(NamedTuple):
+    '''
+    Partial distributions of a knapsack over the rows of a page, keeping only the ones that no other one beats
+    on both BD used and value. Sorted from the fewest BD to the most, so the values go up too
+    '''
+    costs: np.ndarray #BD each distribution uses
+    values: np.ndarray #value of each distribution, i.e. synergy energy/tick
+    bd: np.ndarray #one distribution per line, for all 7 rows. Rows that haven't been added yet have 0
+
+
+def get_empty_frontier(rows:int = 7) -> Frontier:
+    return Frontier(np.zeros(1, dtype=np.int64), np.zeros(1), np.zeros((1, rows), dtype=np.int64))
+
+
+def prune_frontier(frontier:Frontier) -> Frontier:
+    '''
+    Drops every distribution that another one beats on BD used and value (or ties on one and beats on the other).
+    This only sorts by BD used, which is much faster than also sorting by value, and is fastest when the costs
+    come in a few sorted runs (see add_row_options)
+    '''
+    order = np.argsort(frontier.costs, kind="stable")
+    costs, values = frontier.costs[order], frontier.values[order]
+    best_before = np.concatenate(([-np.inf], np.maximum.accumulate(values)[:-1]))
+    keep = np.flatnonzero(values > best_before)
+    #the values kept only go up, so out of the ones kept with the same BD used, only the last one is best
+    last_of_cost = np.ones(len(keep), dtype=bool)
+    last_of_cost[:-1] = costs[keep[1:]] != costs[keep[:-1]]
+    keep = keep[last_of_cost]
+    return Frontier(costs[keep], values[keep], frontier.bd[order[keep]])
+
+
+def add_row_options(frontier:Frontier, row_index:int, option_bd:np.ndarray, option_values:np.ndarray, budget:int) -> Frontier:
+    '''
+    Adds one row to every distribution of a frontier, trying each of the row's options (BD on the row, and the value
+    that gives). Anything over budget BD is dropped, and the result is pruned again.
+    The combinations are laid out one option at a time, so their costs come in one sorted run per option
+    '''
+    option_bd = np.asarray(option_bd, dtype=np.int64)
+    costs = (option_bd[:, None] + frontier.costs[None, :]).ravel()
+    values = (np.asarray(option_values, dtype=float)[:, None] + frontier.values[None, :]).ravel()
+    keep = np.flatnonzero(costs <= budget)
+    #prunes with the index of each combination in place of its distribution, so only the ones kept are built
+    pruned = prune_frontier(Frontier(costs[keep], values[keep], keep))
+    option_index, state_index = np.divmod(pruned.bd, len(frontier.costs))
+    bd = frontier.bd[state_index]
+    bd[:, row_index] = option_bd[option_index]
+    return Frontier(pruned.costs, pruned.values, bd)
+
+
+def merge_frontiers(frontiers:List[Frontier]) -> Frontier:
+    return prune_frontier(Frontier(np.concatenate([frontier.costs for frontier in frontiers]),
+                                   np.concatenate([frontier.values for frontier in frontiers]),
+                                   np.concatenate([frontier.bd for frontier in frontiers])))
+
+
+def get_chain_optimum(values:np.ndarray, gains:np.ndarray, consume:np.ndarray, budget:int) -> np.ndarray:
+    '''
+    Exact knapsack over every number of BD on each row, where each row's gains have to cover what the row after it consumes.
+    Rows are added from the last one down, in a table of the best value for each number of BD used so far and
+    number of BD on the row just added, since that's what decides how much the next row down has to make up.
+    This is O(rows * budget^2) in both time and memory, so it's only meant for small budgets
+    Params:
+        values: rows x (budget+1) array of the value of each number of BD on each row, i.e. synergy energy/tick
+        gains: rows x (budget+1) array of the gains/tick of each number of BD on each row
+        consume: rows x (budget+1) array of what each number of BD on each row consumes from the row before it per tick
+        budget: most BD to use
+    Returns:
+        bd: the best distribution, with one number of BD per row
+    '''
+    rows = values.shape[0]
+    size = budget + 1
+    tables = [np.full((size, size), -np.inf)]
+    tables[0][np.arange(size), np.arange(size)] = values[-1]
+    for i in range(rows-2, -1, -1):
+        order = np.argsort(consume[i+1], kind="stable")
+        #best value above for each number of BD used, out of the amounts on the row after that consume the least
+        best_above = np.maximum.accumulate(tables[-1][:, order], axis=1)
+        number_fed = np.searchsorted(consume[i+1][order], gains[i], side="right")
+        table = np.full((size, size), -np.inf)
+        for number_bd in range(size):
+            if number_fed[number_bd] > 0:
+                table[number_bd:, number_bd] = best_above[:size-number_bd, number_fed[number_bd]-1] + values[i, number_bd]
+        tables.append(table)
+
+    #walks back up from the best entry, finding an amount on the row after that each amount came from
+    bd = np.zeros(rows, dtype=np.int64)
+    used, number_bd = np.unravel_index(int(np.argmax(tables[-1])), tables[-1].shape)
+    for i in range(rows-1):
+        bd[i] = number_bd
+        used -= number_bd
+        above = np.where(consume[i+1] <= gains[i, number_bd], tables[rows-2-i][used], -np.inf)
+        number_bd = int(np.argmax(above))
+    bd[rows-1] = number_bd
+    return bd
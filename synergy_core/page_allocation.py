@@ -0,0 +1,75 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+
+class PageObjective(NamedTuple):
+    '''
+    What to optimize on one page when splitting BD across pages, see SynergyModel.allocate_across_pages
+    '''
+    page: int #page of synergy, 1 indexed
+    method: str #"maximize_one_row", "flat_up_to_row" or "maximize_energy_on_page"
+    row: int = 7 #row to maximize or keep flat up to, not used for energy
+    weight: float = 1 #how much this page counts toward the total score
+
+
+class ResponseCurve(NamedTuple):
+    '''
+    Value of a page objective for a range of BD counts. Values never go down as BD go up,
+    and anything between two samples is linearly interpolated
+    '''
+    bd: np.ndarray #BD counts that were sampled, starting at 0 and ending at the total BD
+    values: np.ndarray #objective value at each sampled BD count
+
+    def value_at(self, bd:np.ndarray) -> np.ndarray:
+        return np.interp(bd, self.bd, self.values)
+
+
+class PageAllocation(NamedTuple):
+    '''
+    Result of SynergyModel.allocate_across_pages
+    '''
+    split: Dict[int, int] #BD given to each page
+    results: Dict[int, Tuple[np.ndarray, np.ndarray, float]] #(bd_array, gains_array, syn_energy_per_tick) of each page
+    score: float #weighted sum of each page's objective, relative to what it would get with all of the BD
+
+
+def get_sample_bd(total_bd:int, samples:int) -> np.ndarray:
+    '''
+    Returns the BD counts to sample a response curve at. These are spaced geometrically, since the optimizers'
+    results change the most at low BD counts
+    '''
+    if total_bd <= samples:
+        return np.arange(total_bd + 1)
+    sample_bd = np.round(np.geomspace(1, total_bd, samples - 1)).astype(int)
+    return np.unique(np.concatenate(([0], sample_bd, [total_bd])))
+
+
+def allocate_grid(scores:List[np.ndarray]) -> Tuple[List[int], float]:
+    '''
+    Splits a number of equal BD steps across pages, so that the sum of their scores is as high as possible.
+    This is a dynamic program over the pages, and is exact for the given scores
+    Params:
+        scores: for each page, its score when given 0, 1, ..., steps BD steps
+    Returns:
+        steps: number of BD steps given to each page
+        score: the total score of the split
+    '''
+    number_steps = len(scores[0]) - 1
+    best = scores[0].copy()
+    choices = []
+    #given[total, taken] is the best score for total steps, when the newest page takes taken of them
+    total_index, taken_index = np.meshgrid(np.arange(number_steps + 1), np.arange(number_steps + 1), indexing="ij")
+    valid = taken_index <= total_index
+    for page_scores in scores[1:]:
+        given = np.where(valid, best[np.maximum(total_index - taken_index, 0)] + page_scores[taken_index], -np.inf)
+        choices.append(np.argmax(given, axis=1))
+        best = np.max(given, axis=1)
+
+    steps = [0] * len(scores)
+    remaining = number_steps
+    for i in range(len(scores) - 1, 0, -1):
+        steps[i] = int(choices[i-1][remaining])
+        remaining -= steps[i]
+    steps[0] = remaining
+    return steps, float(best[number_steps])
@@ -0,0 +1,28 @@
+from typing import List, NamedTuple
+
+import numpy as np
+
+
+class FrontierPoint(NamedTuple):
+    '''
+    One distribution on the synergy energy vs row gains frontier, see SynergyModel.energy_gains_frontier
+    '''
+    bd_array: np.ndarray #bd distribution, for all 7 rows
+    gains_array: np.ndarray #gains/tick of every row
+    syn_energy: float #synergy energy gained per tick
+    row_gains: float #gains/tick of the row being maximized
+
+
+def pareto_filter(points:List[FrontierPoint]) -> List[FrontierPoint]:
+    '''
+    Drops every point that another point beats on both row gains and synergy energy (or ties on one and beats on the other).
+    Returns the rest sorted from the most row gains to the most synergy energy
+    '''
+    ordered = sorted(points, key=lambda point: (-point.row_gains, -point.syn_energy))
+    frontier = []
+    best_energy = -np.inf
+    for point in ordered:
+        if point.syn_energy > best_energy:
+            frontier.append(point)
+            best_energy = point.syn_energy
+    return frontier
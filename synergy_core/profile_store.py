@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Snapshot(NamedTuple):
+    '''
+    One saved account state in a ProfileStore
+    '''
+    snapshot_id: int
+    profile: str #name of the profile the state was saved under
+    saved_at: float #unix time the state was saved at
+    state: dict #state in the same format as the saved json file, see SynergyModel.get_state_dict
+
+
+class ProfileStore:
+    '''
+    Local SQLite store of many named account states (profiles), keeping every state saved for each of them.
+    Snapshots are indexed by profile and save time, so loading the newest state of a profile, or its state at some
+    earlier time, doesn't read in anything else. States are stored as compact json, in the same format as the saved
+    settings file, so old settings files can be imported and states can be exported straight to batch_optimizer.py
+
+    Params:
+        ----
+        path: file of the SQLite database, created if it doesn't exist. ":memory:" keeps it in memory only
+    '''
+    def __init__(self, path:str):
+        self.path = path
+        #batch_optimizer.py reads jobs from the store in the worker pool's task thread
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("PRAGMA foreign_keys = ON")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS profiles (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY, "
+                "profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE, "
+                "saved_at REAL NOT NULL, state TEXT NOT NULL)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS snapshots_by_profile_time ON snapshots (profile_id, saved_at)")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "ProfileStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_profile_id(self, profile:str, create:bool = False) -> Optional[int]:
+        row = self.connection.execute("SELECT id FROM profiles WHERE name = ?", (profile,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            return None
+        return self.connection.execute("INSERT INTO profiles (name) VALUES (?)", (profile,)).lastrowid
+
+    def save(self, profile:str, state:dict, saved_at:Optional[float] = None) -> int:
+        '''
+        Adds a snapshot of a state to a profile, creating the profile if needed, and returns the snapshot's id.
+        Earlier snapshots of the profile are kept
+        '''
+        return self.save_many([(profile, state, saved_at)])[0]
+
+    def save_many(self, snapshots:Iterable[Tuple[str, dict, Optional[float]]]) -> List[int]:
+        '''
+        Adds many (profile, state, saved_at) snapshots in a single transaction, which is much faster than saving
+        them one at a time. A saved_at of None uses the current time
+        '''
+        snapshot_ids = []
+        profile_ids = {}
+        with self.connection:
+            for profile, state, saved_at in snapshots:
+                if profile not in profile_ids:
+                    profile_ids[profile] = self.get_profile_id(profile, create=True)
+                if saved_at is None:
+                    saved_at = time.time()
+                cursor = self.connection.execute(
+                    "INSERT INTO snapshots (profile_id, saved_at, state) VALUES (?, ?, ?)",
+                    (profile_ids[profile], saved_at, json.dumps(state, separators=(",", ":"))))
+                snapshot_ids.append(cursor.lastrowid)
+        return snapshot_ids
+
+    def load(self, profile:str, at:Optional[float] = None) -> Optional[dict]:
+        '''
+        Returns the newest state of a profile, or the newest one saved at or before the given unix time.
+        Returns None if there isn't one
+        '''
+        snapshot = self.get_snapshot(profile, at)
+        return None if snapshot is None else snapshot.state
+
+    def get_snapshot(self, profile:str, at:Optional[float] = None) -> Optional[Snapshot]:
+        query = ("SELECT snapshots.id, saved_at, state FROM snapshots JOIN profiles ON profiles.id = profile_id "
+                 "WHERE name = ? AND saved_at <= ? ORDER BY saved_at DESC, snapshots.id DESC LIMIT 1")
+        row = self.connection.execute(query, (profile, float("inf") if at is None else at)).fetchone()
+        if row is None:
+            return None
+        return Snapshot(row[0], profile, row[1], json.loads(row[2]))
+
+    def history(self, profile:str, start:Optional[float] = None, end:Optional[float] = None) -> List[Snapshot]:
+        '''
+        Returns every snapshot of a profile saved between the given unix times, oldest first
+        '''
+        query = ("SELECT snapshots.id, saved_at, state FROM snapshots JOIN profiles ON profiles.id = profile_id "
+                 "WHERE name = ? AND saved_at >= ? AND saved_at <= ? ORDER BY saved_at, snapshots.id")
+        rows = self.connection.execute(query, (profile, float("-inf") if start is None else start,
+                                               float("inf") if end is None else end))
+        return [Snapshot(snapshot_id, profile, saved_at, json.loads(state)) for snapshot_id, saved_at, state in rows]
+
+    def get_profile_names(self) -> List[str]:
+        return [row[0] for row in self.connection.execute("SELECT name FROM profiles ORDER BY name")]
+
+    def delete_profile(self, profile:str):
+        '''
+        Deletes a profile and every snapshot of it
+        '''
+        with self.connection:
+            self.connection.execute("DELETE FROM profiles WHERE name = ?", (profile,))
+
+    def iterate_latest(self, profiles:Optional[List[str]] = None, at:Optional[float] = None) -> Iterator[Snapshot]:
+        '''
+        Yields the newest snapshot of every profile (or of the given ones), saved at or before the given unix time.
+        This is a single query, and snapshots are read in as they're yielded
+        '''
+        query = ("SELECT snapshots.id, name, saved_at, state FROM snapshots JOIN profiles ON profiles.id = profile_id "
+                 "WHERE snapshots.id = (SELECT newest.id FROM snapshots AS newest "
+                 "WHERE newest.profile_id = profiles.id AND newest.saved_at <= ? "
+                 "ORDER BY newest.saved_at DESC, newest.id DESC LIMIT 1)")
+        parameters = [float("inf") if at is None else at]
+        if profiles is not None:
+            query += f" AND name IN ({', '.join('?' * len(profiles))})"
+            parameters += profiles
+        for snapshot_id, profile, saved_at, state in self.connection.execute(query + " ORDER BY name", parameters):
+            yield Snapshot(snapshot_id, profile, saved_at, json.loads(state))
+
+    def export_jsonl(self, output_file, profiles:Optional[List[str]] = None, at:Optional[float] = None) -> int:
+        '''
+        Writes the newest state of every profile (or of the given ones) to an open file, one json object per line,
+        which is the input format of batch_optimizer.py. Each line also has a "profile" key. Returns the number of lines
+        '''
+        lines = 0
+        for snapshot in self.iterate_latest(profiles, at):
+            output_file.write(json.dumps({"profile": snapshot.profile, **snapshot.state}) + "\n")
+            lines += 1
+        return lines
+
+    def import_json_file(self, profile:str, path:str, saved_at:Optional[float] = None) -> int:
+        '''
+        Imports a settings file saved by SynergyModel.save_json_file as a snapshot of a profile.
+        If no save time is given, the file's modified time is used
+        '''
+        if saved_at is None:
+            saved_at = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        return self.save(profile, state, saved_at)
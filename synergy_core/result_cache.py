@@ -0,0 +1,95 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+#bump this whenever an optimizer changes what it returns for the same inputs, so older cached results aren't used
+ALGORITHM_VERSION = 3
+
+
+def get_input_hash(key:tuple, fingerprint:tuple) -> str:
+    '''
+    Returns a hash of an optimization's arguments and the inputs its result depends on (see SynergyModel.run_cached),
+    along with the algorithm version. Floats are written out exactly, so only identical inputs hash the same
+    '''
+    canonical = json.dumps([ALGORITHM_VERSION, key, fingerprint], separators=(",", ":"),
+                           default=lambda value: value.tolist() if isinstance(value, (np.ndarray, np.generic)) else str(value))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    '''
+    On-disk cache of optimization results, keyed by a hash of their inputs (see get_input_hash).
+    This keeps results across restarts of the app and across batch runs. Once the stored results go over max_bytes,
+    the ones that were used the longest ago are dropped.
+    Can be shared between threads, and between processes through SQLite's own locking
+
+    Params:
+        ----
+        path: file of the SQLite database, created if it doesn't exist. ":memory:" keeps it in memory only
+        max_bytes: most bytes of results to keep
+    '''
+    def __init__(self, path:str, max_bytes:int = 32 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        #write ahead logging without syncing every commit, since a lost result only means running it again
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (input_hash TEXT PRIMARY KEY, result TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_by_last_used ON results (last_used)")
+
+    def close(self):
+        self.connection.close()
+
+    def get(self, input_hash:str) -> Optional[Tuple[np.ndarray, np.ndarray, float, int]]:
+        '''
+        Returns the cached (bd_array, gains_array, syn_energy, evaluations) for an input hash, or None if there isn't one
+        '''
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT result FROM results WHERE input_hash = ?", (input_hash,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE results SET last_used = ? WHERE input_hash = ?", (time.time(), input_hash))
+        result = json.loads(row[0])
+        return (np.array(result["bd"], dtype=result["bd dtype"]), np.array(result["gains"], dtype=result["gains dtype"]),
+                result["syn energy"], result["evaluations"])
+
+    def put(self, input_hash:str, bd_array:np.ndarray, gains_array:np.ndarray, syn_energy:float, evaluations:int):
+        '''
+        Stores a result, then drops the least recently used results until the cache fits in max_bytes
+        '''
+        bd_array = np.asarray(bd_array)
+        gains_array = np.asarray(gains_array)
+        result = json.dumps({"bd": bd_array.tolist(), "bd dtype": bd_array.dtype.str, "gains": gains_array.tolist(),
+                             "gains dtype": gains_array.dtype.str, "syn energy": float(syn_energy),
+                             "evaluations": evaluations}, separators=(",", ":"))
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                    (input_hash, result, len(result), time.time()))
+            self.evict()
+
+    def evict(self):
+        total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        over = total_size - self.max_bytes
+        dropped = []
+        for input_hash, size in self.connection.execute("SELECT input_hash, size FROM results ORDER BY last_used"):
+            dropped.append((input_hash,))
+            over -= size
+            if over <= 0:
+                break
+        self.connection.executemany("DELETE FROM results WHERE input_hash = ?", dropped)
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM results")
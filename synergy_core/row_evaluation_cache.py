@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+
+class RowEvaluationCache:
+    '''
+    Bounded least recently used cache for single row evaluations (SynergyRow.calculate_gains_per_tick).
+    The greedy optimizers move BD back and forth, so they keep asking for the same (row, BD) pairs over and over.
+    Keys are (page, row, level, number_bd, progress_mult, power_mult), so a stale entry can never be returned,
+    but the model still clears entries whenever a level or multiplier changes so the cache doesn't fill up with them.
+    Keys are also indexed by (page, row), so dropping one row's entries doesn't have to go through the whole cache
+
+    Params:
+        ----
+        max_size: most evaluations to keep before dropping the least recently used one
+    '''
+
+    def __init__(self, max_size:int = 100000):
+        self.max_size = max_size
+        self._entries:OrderedDict = OrderedDict()
+        self._row_keys:Dict[Tuple[int, int], Set[Hashable]] = {} #keys of each (page, row), see invalidate_row
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key:Hashable) -> Optional[tuple]:
+        '''
+        Returns the cached evaluation for this key, or None if it isn't cached
+        '''
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key:Hashable, result:tuple):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        self._row_keys.setdefault((key[0], key[1]), set()).add(key)
+        if len(self._entries) > self.max_size:
+            oldest_key, _ = self._entries.popitem(last=False)
+            self.discard_row_key(oldest_key)
+
+    def discard_row_key(self, key:Hashable):
+        row_keys = self._row_keys.get((key[0], key[1]))
+        if row_keys is not None:
+            row_keys.discard(key)
+            if len(row_keys) == 0:
+                del self._row_keys[(key[0], key[1])]
+
+    def invalidate_row(self, page:int, row:int):
+        '''
+        Drops every cached evaluation for one row, i.e. when its level changes
+        '''
+        for key in self._row_keys.pop((page, row), ()):
+            del self._entries[key]
+
+    def clear(self):
+        '''
+        Drops every cached evaluation, i.e. when a multiplier changes
+        '''
+        self._entries.clear()
+        self._row_keys.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> Dict[str, float]:
+        '''
+        Returns the hit/miss counters, to see how much the cache is saving
+        '''
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit rate": self.hits / total if total > 0 else 0,
+            "size": len(self._entries)
+        }
@@ -0,0 +1,56 @@
+import time
+from typing import Dict, Optional
+
+
+class RunStats:
+    '''
+    Record of a single optimization run, filled in by SynergyModel while the run goes.
+    Counters are things like page evaluations, row evaluations, cache hits and BD moves, and phase times are the
+    total seconds spent in each named part of the optimizer (see SynergyModel.time_phase)
+
+    Params:
+        ----
+        method: name of the optimization that was run, i.e. "maximize_one_row"
+        args: arguments the optimization was called with
+    '''
+    __slots__ = ("method", "args", "counters", "phase_times", "start_time", "total_time", "converged", "profile_path")
+
+    def __init__(self, method:str, args:tuple):
+        self.method = method
+        self.args = args
+        self.counters:Dict[str, int] = {}
+        self.phase_times:Dict[str, float] = {}
+        self.start_time = time.perf_counter()
+        self.total_time = 0.0
+        self.converged:Optional[bool] = None
+        self.profile_path:Optional[str] = None #where the cProfile output was written, if profiling was on
+
+    def count(self, counter:str, amount:int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def add_phase_time(self, phase:str, seconds:float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.start_time
+
+    def to_dict(self) -> dict:
+        '''
+        Returns the record as a json friendly dictionary
+        '''
+        return {
+            "method": self.method,
+            "args": [arg if isinstance(arg, (int, float, str, bool)) or arg is None else str(arg) for arg in self.args],
+            "total time s": self.total_time,
+            "converged": self.converged,
+            "counters": dict(self.counters),
+            "phase times s": dict(self.phase_times),
+            "profile path": self.profile_path,
+        }
+
+    def summary(self) -> str:
+        '''
+        One line summary of the run, for printing or showing in the GUI
+        '''
+        counters = ", ".join(f"{value} {counter}" for counter, value in self.counters.items())
+        return f"{self.method} took {self.total_time:.4f} s ({counters})"
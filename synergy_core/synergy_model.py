@@ -0,0 +1,1983 @@
+import time
+import json
+import os
+import contextlib
+import copy
+import cProfile
+import functools
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Dict, List, Sequence, Tuple
+import math
+
+import numpy as np 
+
+from synergy_core.synergy_page import SynergyPage
+from synergy_core.row_evaluation_cache import RowEvaluationCache
+from synergy_core.run_stats import RunStats
+from synergy_core.horizon import HorizonTrajectory, ReassignmentStep, ReassignmentPlan
+from synergy_core.page_allocation import PageObjective, ResponseCurve, PageAllocation, get_sample_bd, allocate_grid
+from synergy_core.pareto import FrontierPoint, pareto_filter
+from synergy_core.knapsack import Frontier, get_empty_frontier, add_row_options, merge_frontiers, get_chain_optimum
+from synergy_core.profile_store import ProfileStore
+from synergy_core.result_cache import ResultCache, get_input_hash
+from synergy_core.what_if import (WhatIfResult, calculate_potion_bonus, calculate_progress_multiplier, calculate_power_multiplier,
+                                  calculate_energy_multiplier, get_input_grid, get_upgrade_grid, rank_results)
+
+class OptimizationCancelled(Exception):
+    '''
+    Raised from inside an optimizer when its progress callback asks it to stop
+    '''
+
+class OptimizationResult(NamedTuple):
+    '''
+    Result of one step of an optimization, see SynergyModel.iterate_steps
+    '''
+    bd_array: np.ndarray #bd distribution
+    gains_array: np.ndarray #gains/tick of the distribution
+    syn_energy: float #synergy energy gained per tick
+    converged: bool #True if the optimization finished, False if this is an intermediate result or the budget ran out
+    evaluations: int #number of steps run so far
+
+class SweepPoint(NamedTuple):
+    '''
+    maximize_one_row result for one number of BD, see SynergyModel.sweep_maximize_one_row
+    '''
+    total_bd: int #number of BD the distribution uses
+    bd_array: np.ndarray #bd distribution to maximize the desired row
+    gains_array: np.ndarray #gains/tick of the distribution
+    syn_energy: float #synergy energy gained per tick
+
+class TargetResult(NamedTuple):
+    '''
+    Result of SynergyModel.min_bd_for_bonus and SynergyModel.hours_for_bonus
+    '''
+    total_bd: int #number of BD the distribution uses
+    hours: float #hours until the target is projected to be reached
+    bd_array: np.ndarray #maximize_one_row distribution with total_bd BD
+    gains_array: np.ndarray #gains/tick of the distribution
+    syn_energy: float #synergy energy gained per tick
+    reached: bool #False if the target can't be reached within the limits, in which case the rest is for the limit
+
+def instrumented(optimization:Callable) -> Callable:
+    '''
+    Decorator for the public optimizations, which records a RunStats for every run (see SynergyModel.run_instrumented)
+    '''
+    @functools.wraps(optimization)
+    def wrapper(self:"SynergyModel", *args, **kwargs):
+        return self.run_instrumented(optimization, *args, **kwargs)
+    return wrapper
+
+if os.name == "nt":
+    JSON_SAVE_LOCATION = os.path.join(os.getenv('APPDATA'), "WAMI Optimizer", "synergy_settings.json")
+elif os.name == "posix":
+    JSON_SAVE_LOCATION = os.path.join(os.getenv("HOME"), ".wami_optimizer", "synergy_settings.json")
+PROFILE_STORE_LOCATION = os.path.join(os.path.split(JSON_SAVE_LOCATION)[0], "synergy_profiles.db")
+RESULT_CACHE_LOCATION = os.path.join(os.path.split(JSON_SAVE_LOCATION)[0], "synergy_results.db")
+#most BD maximize_energy_on_page with non_negative solves exactly, over every number of BD on each row
+NON_NEGATIVE_TABLE_MAX_BD = 500
+
+class SynergyModel:
+    '''
+    Class to hold the state of different variables, such as synergy levels, current synergy power, etc.
+    This will also perform the optimization using these given inputs.
+    This has no Qt dependency, so it can be used in worker processes and scripts. The GUI uses backend.Backend, which
+    wraps this and turns the changes reported to add_listener callbacks into Qt signals
+    The optimization options are:
+        Single row:
+            maximizes the gains on a single row
+        Flat distribution:
+            tries to make all of the synergy gains/hour the same, up to the inputted row
+        Synergy Energy:
+            tries to maximize synergy energy gains on a single page
+                this basically just min ticks everything, starting from the first row and moving upwards
+
+    Params:
+        ----
+        current_levels_page_X: np.ndarray of the current levels for each page of synergy, from row 1 to row 7
+        current_points_page_X: np.ndarray of the current points for each page of synergy, from row 1 to row 7
+        total_bd: int of how many BD the user current has
+        synergy_input_dict: dictionary of various inputs that impact synergy progress or speed
+    '''
+
+    def __init__(self, current_levels_page_1: np.ndarray, current_levels_page_2: np.ndarray, current_levels_page_3:np.ndarray,
+                 current_points_page_1:np.ndarray, current_points_page_2:np.ndarray, current_points_page_3:np.ndarray,
+                 total_bd:int, synergy_inputs_dict:dict):
+        self.listeners:List[Callable] = []
+        #batched updates, see batch_updates
+        self.batch_depth = 0
+        self.defer_recalculations = False
+        self.pending_recalculations:List[Callable] = []
+        self.pending_events:Dict[str, float] = {}
+        self.batch_start_values:Dict[str, float] = {}
+        #called by the optimizers as they run, see report_progress
+        self.progress_callback:Optional[Callable[[int, float], Optional[bool]]] = None
+        self.last_result:Optional[OptimizationResult] = None #full result of the last optimization run, see run_steps
+        self.deadline:Optional[float] = None #time.time() the running optimization has to stop by, see iterate_steps
+        #instrumentation, see run_instrumented
+        self.run_hooks:List[Callable[[RunStats], None]] = []
+        self.current_run_stats:Optional[RunStats] = None
+        self.last_run_stats:Optional[RunStats] = None
+        self.verbose = True #prints a one line summary of every run
+        self.profile_directory:Optional[str] = None #if set, every run is profiled with cProfile and written here
+        self.run_count = 0
+        #response curves of page objectives, see get_response_curve
+        self.response_curves:Dict[tuple, ResponseCurve] = {}
+        #last converged result of each optimization, with the inputs it was found for, see run_cached
+        self.solution_cache:Dict[tuple, Tuple[tuple, OptimizationResult]] = {}
+        self.profile_store:Optional[ProfileStore] = None #opened the first time a profile is saved or loaded
+        self.result_cache:Optional[ResultCache] = None #on-disk results kept across runs, see run_cached
+        #sets up the current levels
+        #all rows share one cache of their gains evaluations, since the optimizers keep revisiting the same BD
+        self.row_cache = RowEvaluationCache()
+        self.synergy_pages:Dict[int, SynergyPage] = {}
+        self.synergy_pages[1] = SynergyPage(1, current_levels_page_1, current_points_page_1, self.row_cache)
+        self.synergy_pages[2] = SynergyPage(2, current_levels_page_2, current_points_page_2, self.row_cache)
+        self.synergy_pages[3] = SynergyPage(3, current_levels_page_3, current_points_page_3, self.row_cache)
+    
+        self.total_bd = total_bd
+        #processes the inputs dict
+        self.syn_pot_active:bool = synergy_inputs_dict.get("Active Syn Pot", False)
+        self.newb_progress_trophy:bool = synergy_inputs_dict.get("Newb Progress Trophy", False)
+        self.pro_progress_trophy:bool = synergy_inputs_dict.get("Pro Progress Trophy",False)
+        self.newb_power_trophy:bool = synergy_inputs_dict.get("Newb Power Trophy", False)
+        self.pro_power_trophy:bool = synergy_inputs_dict.get("Pro Power Trophy", False)
+        self.syn_power_soul_purchase:bool = synergy_inputs_dict.get("Soul Power Purchase", False)
+        self.syn_power_adventure:float = synergy_inputs_dict.get("Adventure Power %", 0)
+        self.syn_power_perk_level:int = synergy_inputs_dict.get("Syn Power Perks Level", 0)
+        self.max_stage:int = synergy_inputs_dict.get("Max Stage",415)
+        self.pomos_power_levels:int = synergy_inputs_dict.get("Pomos Power Levels",0)
+        self.syn_energy_adventure:float = synergy_inputs_dict.get("Adventure Energy %",0)
+        self.newb_energy_trophy:bool = synergy_inputs_dict.get("Newb Energy Trophy",False)
+        self.pro_energy_trophy:bool = synergy_inputs_dict.get("Pro Energy Trophy",False)
+
+        self._synergy_progress:float = 0
+        self._synergy_power:float = 0
+        self._synergy_energy:float = 0
+        self.update_potion_bonus()
+        self.calculate_synergy_progress()
+        self.calculate_synergy_power()
+        self.calculate_synergy_energy()
+
+    def add_listener(self, callback:Callable):
+        '''
+        Adds a callback that gets called with the event name ("synergy_progress_changed", "synergy_power_changed" or
+        "synergy_energy_changed") and the new value whenever one of the multipliers changes
+        '''
+        self.listeners.append(callback)
+
+    def notify(self, event:str, value:float):
+        if self.batch_depth > 0:
+            self.pending_events[event] = value
+            return
+        for callback in self.listeners:
+            callback(event, value)
+
+    @contextlib.contextmanager
+    def batch_updates(self):
+        '''
+        Context manager for changing many inputs at once, i.e. when loading a save.
+        Inside it, the multipliers are only recalculated once at the end, no matter how many inputs they depend on
+        changed, and change notifications from the model and every row are held back. At the end, each changed value
+        is reported once. These can be nested, and everything happens when the outermost one ends
+        '''
+        self.batch_depth += 1
+        if self.batch_depth == 1:
+            self.defer_recalculations = True
+            self.batch_start_values = {"synergy_progress_changed": self.synergy_progress,
+                                       "synergy_power_changed": self.synergy_power,
+                                       "synergy_energy_changed": self.synergy_energy}
+            for _, synergy_page in self.synergy_pages.items():
+                synergy_page.begin_batch()
+        try:
+            yield self
+        finally:
+            if self.batch_depth == 1:
+                self.defer_recalculations = False
+                pending_recalculations = self.pending_recalculations
+                self.pending_recalculations = []
+                for recalculation in pending_recalculations:
+                    recalculation()
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                pending_events = self.pending_events
+                self.pending_events = {}
+                for event, value in pending_events.items():
+                    if value != self.batch_start_values.get(event):
+                        self.notify(event, value)
+                for _, synergy_page in self.synergy_pages.items():
+                    synergy_page.end_batch()
+
+    def defer_recalculation(self, recalculation:Callable) -> bool:
+        '''
+        Inside batch_updates, queues a multiplier recalculation to run once at the end and returns True.
+        Otherwise, returns False so it runs right away
+        '''
+        if not self.defer_recalculations:
+            return False
+        if recalculation not in self.pending_recalculations:
+            self.pending_recalculations.append(recalculation)
+        return True
+
+    def report_progress(self, iterations:int, best_gains:float):
+        '''
+        Called by the optimizers as they run. If a progress callback is set, it gets the iterations done so far and the
+        current best gains/tick, and can return False to cancel the optimization, which raises OptimizationCancelled
+        '''
+        self.count("iterations")
+        if self.progress_callback is not None and self.progress_callback(iterations, best_gains) is False:
+            raise OptimizationCancelled()
+
+    def add_run_hook(self, callback:Callable[[RunStats], None]):
+        '''
+        Adds a callback that gets the RunStats of every optimization run once it finishes
+        '''
+        self.run_hooks.append(callback)
+
+    def count(self, counter:str, amount:int = 1):
+        '''
+        Adds to a counter of the optimization that is currently running, if there is one
+        '''
+        if self.current_run_stats is not None:
+            self.current_run_stats.count(counter, amount)
+
+    @contextlib.contextmanager
+    def time_phase(self, phase:str):
+        '''
+        Context manager that adds the time spent inside it to a phase of the optimization that is currently running.
+        Don't yield from an optimizer inside one of these, or the phase will include whatever the caller does meanwhile
+        '''
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current_run_stats is not None:
+                self.current_run_stats.add_phase_time(phase, time.perf_counter() - start_time)
+
+    def get_page_evaluations(self) -> int:
+        return sum(synergy_page.evaluations for synergy_page in self.synergy_pages.values())
+
+    def run_instrumented(self, optimization:Callable, *args, **kwargs):
+        '''
+        Runs an optimization while recording its RunStats, which are kept in last_run_stats and passed to every run hook.
+        The page evaluation and cache counters come from the difference in the totals before and after the run.
+        If profile_directory is set, the run is also profiled with cProfile, and the profile is written there
+        '''
+        if self.current_run_stats is not None:
+            #runs inside another run count toward the outer one
+            return optimization(self, *args, **kwargs)
+        self.run_count += 1
+        run_stats = RunStats(optimization.__name__, args)
+        page_evaluations = self.get_page_evaluations()
+        cache_hits, cache_misses = self.row_cache.hits, self.row_cache.misses
+        self.last_result = None
+        self.current_run_stats = run_stats
+        profiler = cProfile.Profile() if self.profile_directory is not None else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+            result = optimization(self, *args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                run_stats.profile_path = self.write_profile(profiler, run_stats)
+            self.current_run_stats = None
+        run_stats.finish()
+        run_stats.count("page evaluations", self.get_page_evaluations() - page_evaluations)
+        run_stats.count("row evaluations", self.row_cache.hits + self.row_cache.misses - cache_hits - cache_misses)
+        run_stats.count("cache hits", self.row_cache.hits - cache_hits)
+        if self.last_result is not None:
+            run_stats.converged = self.last_result.converged
+            run_stats.count("steps", self.last_result.evaluations)
+        self.last_run_stats = run_stats
+        if self.verbose:
+            print(run_stats.summary())
+        for callback in self.run_hooks:
+            callback(run_stats)
+        return result
+
+    def write_profile(self, profiler:cProfile.Profile, run_stats:RunStats) -> str:
+        '''
+        Writes a profile to the profile directory, and returns its path. The files can be opened with pstats or snakeviz
+        '''
+        os.makedirs(self.profile_directory, exist_ok=True)
+        file_name = f"{run_stats.method}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{self.run_count}.prof"
+        profile_path = os.path.join(self.profile_directory, file_name)
+        profiler.dump_stats(profile_path)
+        return profile_path
+
+    def invalidate_tick_ladders(self):
+        for _, synergy_page in self.synergy_pages.items():
+            synergy_page.invalidate_tick_ladders()
+
+    def calculate_synergy_progress(self):
+        '''
+        Function to calculate the current total amount of synergy progress multiplier
+        '''
+        if self.defer_recalculation(self.calculate_synergy_progress):
+            return
+        #the formulas are shared with the what-if grid, see what_if.py
+        self.set_synergy_progress(float(calculate_progress_multiplier(self.get_inputs_dict())))
+
+    def calculate_synergy_power(self):
+        '''
+        Function to calculate the current total amount of synergy power multiplier
+        '''
+        if self.defer_recalculation(self.calculate_synergy_power):
+            return
+        self.set_syngery_power(float(calculate_power_multiplier(self.get_inputs_dict())))
+
+    def calculate_synergy_energy(self):
+        '''
+        calculates synergy energy multiplier. Double checked the gain code, and this is not floored
+        '''
+        if self.defer_recalculation(self.calculate_synergy_energy):
+            return
+        self.set_synergy_energy(float(calculate_energy_multiplier(self.get_inputs_dict())))
+
+    def update_potion_bonus(self):
+        '''
+        Gets the increase to potion effectiveness based off of max stage.
+        For every 100 stages exactly above 400, potion effectiveness exponentially increases by 20% each time
+        '''
+        self.potion_bonus = float(calculate_potion_bonus(self.max_stage))
+
+    def get_synergy_progress(self)->float:
+        return self._synergy_progress
+    def set_synergy_progress(self, value:float):
+        if value != self.synergy_progress:
+            self._synergy_progress = value
+            #the tick ladders and row cache are built for one progress multiplier
+            self.invalidate_tick_ladders()
+            self.row_cache.clear()
+            self.response_curves.clear()
+            self.notify("synergy_progress_changed", self.synergy_progress)
+    synergy_progress = property(get_synergy_progress, set_synergy_progress)
+
+    def get_synergy_power(self)->float:
+        return self._synergy_power
+    def set_syngery_power(self, value:float):
+        if value != self.synergy_power:
+            self._synergy_power = value
+            self.row_cache.clear()
+            self.response_curves.clear()
+            self.notify("synergy_power_changed", self.synergy_power)
+    synergy_power = property(get_synergy_power, set_syngery_power)
+
+    def get_synergy_energy(self) -> float:
+        return self._synergy_energy
+    def set_synergy_energy(self, value:float):
+        if value != self.synergy_energy:
+            self._synergy_energy = value
+            self.notify("synergy_energy_changed", self.synergy_energy)
+    synergy_energy = property(get_synergy_energy, set_synergy_energy)
+
+    def update_single_level(self, page:int, row:int, new_level:int):
+        #pass through function to update a single rows level
+        self.synergy_pages[page].synergy_rows[row].set_level(new_level)
+    def update_single_point(self, page:int, row:int, new_points:float):
+        #pass through function to update a single rows points
+        self.synergy_pages[page].synergy_rows[row].set_current_points(new_points)
+
+    #setters for other synergy inputs
+    def set_total_bd(self, value:int):
+        self.total_bd = value
+    def set_syn_pot_active(self, value:bool):
+        self.syn_pot_active = value
+        self.calculate_synergy_power()
+        self.calculate_synergy_progress()
+    def set_newb_progress_trophy(self, value:bool):
+        if value != self.newb_progress_trophy:
+            self.newb_progress_trophy = value
+            self.calculate_synergy_progress()
+    def set_pro_progress_trophy(self, value:bool):
+        if value != self.pro_progress_trophy:
+            self.pro_progress_trophy = value
+            self.calculate_synergy_progress()
+    def set_newb_power_trophy(self, value:bool):
+        if value != self.newb_power_trophy:
+            self.newb_power_trophy = value
+            self.calculate_synergy_power()
+    def set_pro_power_trophy(self, value:bool):
+        if value != self.pro_power_trophy:
+            self.pro_power_trophy = value
+            self.calculate_synergy_power()
+    def set_syn_power_soul_purchase(self, value:bool):
+        if value != self.syn_power_soul_purchase:
+            self.syn_power_soul_purchase = value
+            self.calculate_synergy_power()
+    def set_syn_power_adventure(self, value:float):
+        if value != self.syn_power_adventure:
+            self.syn_power_adventure = value
+            self.calculate_synergy_power()
+    def set_syn_power_perk_level(self, value:int):
+        if value != self.syn_power_perk_level:
+            self.syn_power_perk_level = value
+            self.calculate_synergy_power()
+    def set_max_stage(self, value:int):
+        if value != self.max_stage:
+            self.max_stage = value
+            self.update_potion_bonus()
+            self.calculate_synergy_power()
+            self.calculate_synergy_progress()
+    def set_pomos_power_levels(self, value:int):
+        if value != self.pomos_power_levels:
+            self.pomos_power_levels = value
+            self.calculate_synergy_power()
+    def set_syn_energy_adventure(self, value:float):
+        if value != self.syn_energy_adventure:
+            self.syn_energy_adventure = value
+            self.calculate_synergy_energy()
+    def set_newb_energy_trophy(self, value:bool):
+        if value != self.newb_energy_trophy:
+            self.newb_energy_trophy = value
+            self.calculate_synergy_energy()
+    def set_pro_energy_trophy(self, value:bool):
+        if value != self.pro_energy_trophy:
+            self.pro_energy_trophy = value
+            self.calculate_synergy_energy()
+    
+            
+
+    @staticmethod
+    def from_state_dict(synergy_input:dict) -> "SynergyModel":
+        '''
+        Creates a backend from a dictionary in the same format as the saved json file (see get_state_dict)
+        '''
+        level_1 = synergy_input["page 1 levels"] 
+        level_2 = synergy_input["page 2 levels"] 
+        level_3 = synergy_input["page 3 levels"]  
+        point_1 = synergy_input["page 1 points"]  
+        point_2 = synergy_input["page 2 points"] 
+        point_3 = synergy_input["page 3 points"]
+        bd = synergy_input["total bd"] 
+        inputs = synergy_input["inputs dict"] 
+        return SynergyModel(level_1, level_2, level_3, point_1, point_2, point_3, bd, inputs)
+
+    def get_state_dict(self) -> dict:
+        '''
+        Returns all of the current inputs as a dictionary, in the format saved to the json file
+        '''
+        dump = {}
+        dump["page 1 levels"] = self.synergy_pages[1].get_all_levels() 
+        dump["page 2 levels"] = self.synergy_pages[2].get_all_levels() 
+        dump["page 3 levels"] = self.synergy_pages[3].get_all_levels() 
+        dump["page 1 points"] = self.synergy_pages[1].get_all_points() 
+        dump["page 2 points"] = self.synergy_pages[2].get_all_points() 
+        dump["page 3 points"] = self.synergy_pages[3].get_all_points() 
+        dump["total bd"] = self.total_bd
+        dump["inputs dict"] = self.get_inputs_dict()
+        return dump
+
+    def get_snapshot(self) -> "SynergyModel":
+        '''
+        Returns a copy of the model with the same inputs and settings, to run an optimization on while this one can
+        still be changed (i.e. from a background thread while the GUI stays usable).
+        The copy shares result_cache, and starts with a copy of solution_cache, so it can still reuse earlier results.
+        Anything it finds can be brought back with merge_snapshot
+        '''
+        snapshot = SynergyModel.from_state_dict(self.get_state_dict())
+        snapshot.set_synergy_progress(self.synergy_progress)
+        snapshot.set_syngery_power(self.synergy_power)
+        snapshot.set_synergy_energy(self.synergy_energy)
+        snapshot.verbose = self.verbose
+        snapshot.profile_directory = self.profile_directory
+        snapshot.run_count = self.run_count
+        snapshot.run_hooks = list(self.run_hooks)
+        snapshot.solution_cache = dict(self.solution_cache)
+        snapshot.result_cache = self.result_cache
+        return snapshot
+
+    def merge_snapshot(self, snapshot:"SynergyModel"):
+        '''
+        Keeps the results and stats of the runs done on a snapshot (see get_snapshot).
+        Solutions are stored with the inputs they were found for, so they are only reused if this model's inputs match
+        '''
+        self.solution_cache.update(snapshot.solution_cache)
+        self.run_count = max(self.run_count, snapshot.run_count)
+        self.last_result = snapshot.last_result
+        self.last_run_stats = snapshot.last_run_stats
+
+    def get_inputs_dict(self) -> dict:
+        '''
+        Returns the inputs that change the multipliers, in the format of the saved json file's inputs dict
+        '''
+        inputs_dict = {}
+        inputs_dict["Active Syn Pot"] = self.syn_pot_active
+        inputs_dict["Newb Progress Trophy"] = self.newb_progress_trophy
+        inputs_dict["Pro Progress Trophy"] = self.pro_progress_trophy
+        inputs_dict["Newb Power Trophy"] = self.newb_power_trophy
+        inputs_dict["Pro Power Trophy"] = self.pro_power_trophy
+        inputs_dict["Soul Power Purchase"] = self.syn_power_soul_purchase
+        inputs_dict["Adventure Power %"] = self.syn_power_adventure
+        inputs_dict["Syn Power Perks Level"] = self.syn_power_perk_level
+        inputs_dict["Max Stage"] = self.max_stage
+        inputs_dict["Pomos Power Levels"] = self.pomos_power_levels
+        inputs_dict["Adventure Energy %"] = self.syn_energy_adventure
+        inputs_dict["Newb Energy Trophy"] = self.newb_energy_trophy
+        inputs_dict["Pro Energy Trophy"] = self.pro_energy_trophy
+        return inputs_dict
+
+    def save_json_file(self):
+        '''
+        Saves the settings to a json file in appdata/roaming
+        '''
+        dump = self.get_state_dict()
+        if not os.path.exists(os.path.split(JSON_SAVE_LOCATION)[0]):
+            os.makedirs(os.path.split(JSON_SAVE_LOCATION)[0])
+
+        with open(JSON_SAVE_LOCATION, "w", encoding='utf-8') as f:
+            json.dump(dump, f, indent=1)
+
+    @staticmethod
+    def load_json_file():
+        '''
+        class method to load in the json file, so the parameers can be passed in at init
+        '''
+        if os.path.exists(JSON_SAVE_LOCATION):
+            with open(JSON_SAVE_LOCATION) as f:
+                j = json.load(f)
+            return j
+        else:
+            return None
+        
+    def load_from_json_file(self):
+        '''
+        Reloads the previously saved settings
+        '''
+        synergy_input = SynergyModel.load_json_file()
+        if synergy_input is None:
+            return
+        self.apply_state(synergy_input)
+
+    def get_profile_store(self) -> ProfileStore:
+        if self.profile_store is None:
+            if not os.path.exists(os.path.split(PROFILE_STORE_LOCATION)[0]):
+                os.makedirs(os.path.split(PROFILE_STORE_LOCATION)[0])
+            self.profile_store = ProfileStore(PROFILE_STORE_LOCATION)
+        return self.profile_store
+
+    def save_profile(self, profile:str):
+        '''
+        Saves the current settings as a new snapshot of a named profile, see ProfileStore
+        '''
+        self.get_profile_store().save(profile, self.get_state_dict())
+
+    def load_profile(self, profile:str, at:Optional[float] = None) -> bool:
+        '''
+        Loads the newest saved settings of a named profile, or the newest ones saved at or before the given unix time.
+        Returns False if there aren't any
+        '''
+        synergy_input = self.get_profile_store().load(profile, at)
+        if synergy_input is None:
+            return False
+        self.apply_state(synergy_input)
+        return True
+
+    def get_profile_names(self) -> List[str]:
+        return self.get_profile_store().get_profile_names()
+
+    def apply_state(self, synergy_input:dict):
+        '''
+        Sets every input from a dictionary in the same format as the saved json file (see get_state_dict).
+        This is done as one batch (see batch_updates), so each multiplier is recalculated once, and each changed
+        value is reported once
+        '''
+        with self.batch_updates():
+            self.apply_state_inputs(synergy_input)
+
+    def apply_state_inputs(self, synergy_input:dict):
+        level_1 = synergy_input["page 1 levels"] 
+        level_2 = synergy_input["page 2 levels"] 
+        level_3 = synergy_input["page 3 levels"]  
+        point_1 = synergy_input["page 1 points"]  
+        point_2 = synergy_input["page 2 points"] 
+        point_3 = synergy_input["page 3 points"]
+        bd = synergy_input["total bd"] 
+        inputs:dict = synergy_input["inputs dict"] 
+
+        self.synergy_pages[1].update_all_levels(level_1)
+        self.synergy_pages[2].update_all_levels(level_2)
+        self.synergy_pages[3].update_all_levels(level_3)
+        self.synergy_pages[1].update_all_points(point_1)
+        self.synergy_pages[2].update_all_points(point_2)
+        self.synergy_pages[3].update_all_points(point_3)
+        self.set_total_bd(bd)
+
+        
+        self.set_syn_pot_active(inputs.get("Active Syn Pot", False))
+        self.set_newb_progress_trophy(inputs.get("Newb Progress Trophy", False))
+        self.set_pro_progress_trophy(inputs.get("Pro Progress Trophy", False))
+        self.set_newb_power_trophy( inputs.get("Newb Power Trophy", False))
+        self.set_pro_power_trophy(inputs.get("Pro Power Trophy", False))
+        self.set_syn_power_soul_purchase(inputs.get("Soul Power Purchase", False))
+        self.set_syn_power_adventure( inputs.get("Adventure Power %", 0))
+        self.set_syn_power_perk_level( inputs.get("Syn Power Perks Level", 0))
+        self.set_max_stage( inputs.get("Max Stage", 415))
+        self.set_pomos_power_levels( inputs.get("Pomos Power Levels", 0))
+        self.set_syn_energy_adventure( inputs.get("Adventure Energy %", 0))
+        self.set_newb_energy_trophy(inputs.get("Newb Energy Trophy", False))
+        self.set_pro_energy_trophy(inputs.get("Pro Energy Trophy", False))
+
+
+
+    def simulate_horizon(self, page:int, bd_array:List[int], hours:float, samples:int = 101, level_ups:bool = True) -> HorizonTrajectory:
+        '''
+        Projects how the points, bonus and level of every row on a page change over the next few hours,
+        with a fixed BD distribution (see SynergyPage.simulate_horizon).
+        Params:
+            page: page of synergy to run, 1 indexed
+            bd_array: BD on each row, starting at row 1
+            hours: how far ahead to project
+            samples: number of evenly spaced times to sample, including the start and the end
+            level_ups: whether or not every fill raises the row's level by 1
+        Returns:
+            trajectory: HorizonTrajectory, with syn_energy already including the synergy energy multiplier
+        '''
+        ticks = np.linspace(0, 36000 * hours, samples)
+        trajectory = self.synergy_pages[page].simulate_horizon(bd_array, ticks, self.synergy_progress, self.synergy_power, level_ups)
+        return trajectory._replace(syn_energy=trajectory.syn_energy * self.synergy_energy)
+
+    ### Optimization Functions
+    #Each optimization is written as a generator of steps, named <optimization>_steps. Every step yields the best valid
+    #(bd_array, gains_array, syn_energy_per_tick) found so far, and the last step is the final answer.
+    #The public functions run these through iterate_steps, which stops early when a time or evaluation budget runs out
+
+    def get_input_fingerprint(self, page:int, rows:int, bd:Optional[int] = None) -> tuple:
+        '''
+        Returns everything that can change the result of an optimization that only uses the first rows rows of a page.
+        Points never change the distribution, and neither do the levels of other pages or of rows above the ones used
+        '''
+        levels = tuple(self.synergy_pages[page].get_all_levels()[:rows])
+        return (levels, self.synergy_progress, self.synergy_power, self.synergy_energy, self.total_bd if bd is None else bd)
+
+    def run_cached(self, key:tuple, get_fingerprint:Callable[[], tuple], make_steps:Callable[[Optional[OptimizationResult]], Iterator],
+                   time_budget:Optional[float] = None, max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Runs an optimization, reusing its last solution if possible.
+        If nothing that can change the result has changed since the last time it ran (see get_input_fingerprint),
+        the last result is returned right away. If result_cache is set, it's checked next, by a hash of the key and
+        fingerprint. Otherwise make_steps gets the last result (or None) to warm start from.
+        Only converged results are kept, both in memory and in result_cache, and only if the fingerprint is still the
+        same after the run, so a run that saw its inputs change partway through is never stored.
+        The cache keeps its own copies of the arrays, so callers can change the ones they get back
+        Params:
+            key: the optimization and its arguments, i.e. ("maximize_one_row", page, row, solver, bd)
+            get_fingerprint: function that returns the inputs the result depends on, see get_input_fingerprint
+            make_steps: function that takes the last result and returns the optimization's steps
+        '''
+        fingerprint = get_fingerprint()
+        cached = self.solution_cache.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            self.count("solution cache hits")
+            self.last_result = self.copy_result(cached[1])
+            return self.last_result.bd_array, self.last_result.gains_array, self.last_result.syn_energy
+        input_hash = None
+        if self.result_cache is not None:
+            input_hash = get_input_hash(key, fingerprint)
+            stored = self.result_cache.get(input_hash)
+            if stored is not None:
+                self.count("result cache hits")
+                bd_array, gains_array, syn_energy, evaluations = stored
+                self.last_result = OptimizationResult(bd_array, gains_array, syn_energy, True, evaluations)
+                self.solution_cache[key] = (fingerprint, self.copy_result(self.last_result))
+                return bd_array, gains_array, syn_energy
+        if cached is not None:
+            self.count("warm starts")
+        result = self.run_steps(make_steps(cached[1] if cached is not None else None), time_budget, max_evaluations)
+        if self.last_result.converged and get_fingerprint() == fingerprint:
+            self.solution_cache[key] = (fingerprint, self.copy_result(self.last_result))
+            if input_hash is not None:
+                self.result_cache.put(input_hash, *result, self.last_result.evaluations)
+        return result
+
+    @staticmethod
+    def copy_result(result:OptimizationResult) -> OptimizationResult:
+        '''
+        Returns a result with copies of its arrays (or lists)
+        '''
+        return result._replace(bd_array=copy.copy(result.bd_array), gains_array=copy.copy(result.gains_array))
+
+    def iterate_steps(self, steps:Iterator[Tuple[np.ndarray, np.ndarray, float]], time_budget:Optional[float] = None,
+                      max_evaluations:Optional[int] = None) -> Iterator[OptimizationResult]:
+        '''
+        Runs the steps of an optimization, yielding an OptimizationResult for each one.
+        The first step is always waited for, so there is always a valid result to return.
+        After that, this stops as soon as the time budget (in s) or the evaluation budget (number of steps) runs out.
+        While this runs, the time budget is also kept in self.deadline, so that optimizations with long stretches between
+        steps (i.e. the greedy ones) can stop early from inside their loops, see past_deadline.
+        The last result yielded has converged set to True only if the optimization finished on its own
+        '''
+        start_time = time.time()
+        previous_deadline = self.deadline
+        if time_budget is not None:
+            self.deadline = start_time + time_budget if self.deadline is None else min(self.deadline, start_time + time_budget)
+        try:
+            steps = iter(steps)
+            current = next(steps)
+            evaluations = 1
+            while True:
+                out_of_time = self.past_deadline()
+                out_of_evaluations = max_evaluations is not None and evaluations >= max_evaluations
+                if out_of_time or out_of_evaluations:
+                    steps.close()
+                    yield OptimizationResult(*current, False, evaluations)
+                    return
+                try:
+                    following = next(steps)
+                except StopIteration:
+                    #steps that stopped early for the deadline didn't finish
+                    yield OptimizationResult(*current, not self.past_deadline(), evaluations)
+                    return
+                yield OptimizationResult(*current, False, evaluations)
+                current = following
+                evaluations += 1
+        finally:
+            self.deadline = previous_deadline
+
+    def past_deadline(self) -> bool:
+        '''
+        Returns True if the running optimization is out of time, see iterate_steps
+        '''
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def iterate_optimization(self, optimization:str, *args, time_budget:Optional[float] = None, max_evaluations:Optional[int] = None,
+                             **kwargs) -> Iterator[OptimizationResult]:
+        '''
+        Generator version of any optimization, which yields the intermediate results as they are found.
+        i.e. iterate_optimization("maximize_one_row", 1, 7, time_budget = .5) runs maximize_one_row(1, 7) for at most .5 s
+        '''
+        steps = getattr(self, f"{optimization}_steps")(*args, **kwargs)
+        return self.iterate_steps(steps, time_budget, max_evaluations)
+
+    def run_steps(self, steps:Iterator[Tuple[np.ndarray, np.ndarray, float]], time_budget:Optional[float] = None,
+                  max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Runs the steps of an optimization until it finishes or the budget runs out, and returns the best result found.
+        The full result is kept in last_result, and last_result.converged (also in last_run_stats.converged) is False if
+        the budget ran out before the optimization finished
+        '''
+        for result in self.iterate_steps(steps, time_budget, max_evaluations):
+            pass
+        self.last_result = result
+        return result.bd_array, result.gains_array, result.syn_energy
+
+    def evaluate_distribution(self, page:int, bd_array:np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Returns the (bd_array, gains_array, syn_energy_per_tick) result for a distribution on a page
+        '''
+        with self.time_phase("evaluate results"):
+            gains_array, _, _ = self.synergy_pages[page].get_all_gains_per_tick(bd_array, self.synergy_progress, self.synergy_power)
+            syn_energy, _, _ = self.synergy_pages[page].get_all_syn_energy_per_tick(bd_array, self.synergy_progress)
+        return bd_array, gains_array, syn_energy*self.synergy_energy
+
+    @instrumented
+    def maximize_one_row(self, page:int, row:int, solver:str = "bisect", bd:Optional[int] = None, time_budget:Optional[float] = None,
+                         max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Maximizes the gains on one row, while keeping the lower rows barely non-negative.
+        Params:
+            page: page of synergy to run, 1 indexed
+            row: row of synergy to run, 1 indexed
+            solver: "bisect" to solve for the break-even BD of each row directly, "exact" to search only the
+                speed cap tier thresholds, or "greedy" for the original one BD at a time algorithm, which is kept
+                around as a reference
+            bd: the number of bd to optimize with, defaults to total bd
+            time_budget: optional most time to run for, in s
+            max_evaluations: optional most steps to run for
+                if either budget runs out, the best result so far is returned, and last_result.converged is False
+        Returns:
+            bd_array: bd distribution to maximize the desired row
+            gains_array: the final gains/tick of the distribution
+            syn_energy_per_tick: the sum of synergy energy gained per tick
+        '''
+        def make_steps(last_result:Optional[OptimizationResult]) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+            hint_row_bd = int(last_result.bd_array[row-1]) if last_result is not None else None
+            return self.maximize_one_row_steps(page, row, solver, bd, hint_row_bd)
+        return self.run_cached(("maximize_one_row", page, row, solver, bd), lambda: self.get_input_fingerprint(page, row, bd), make_steps,
+                               time_budget, max_evaluations)
+
+    def maximize_one_row_steps(self, page:int, row:int, solver:str = "bisect", bd:Optional[int] = None,
+                               hint_row_bd:Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        if solver == "greedy":
+            return self.maximize_one_row_greedy_steps(page, row, bd)
+        elif solver == "bisect":
+            return self.maximize_one_row_bisect_steps(page, row, bd, hint_row_bd)
+        elif solver == "exact":
+            return self.maximize_one_row_exact_steps(page, row, bd)
+        else:
+            raise ValueError(f"Unknown solver {solver}")
+
+    def maximize_one_row_bisect_steps(self, page:int, row:int, bd:Optional[int] = None,
+                                      hint_row_bd:Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        Solves for the same distribution as the greedy algorithm, without moving BD one at a time.
+        General algo is:
+            for a given number of BD on the desired row, walk down the rows below it and find the smallest number of BD
+                that keeps each of them barely non-negative (see SynergyPage.get_min_bd_below)
+            the BD needed below only goes up as the desired row gets more BD, so bisect for the most BD the desired
+                row can hold while everything still fits in total_bd
+            if the desired row ends up overcapped, trim it down to its min tick, since that gives the same gains and
+                lowers what it consumes
+            any BD left over goes into row 1, since nothing below it can go negative
+        This runs in roughly O(rows * log(BD)^2) row evaluations, no matter how many BD there are.
+        If hint_row_bd is given (i.e. the answer from before a level changed), the bisection starts from a bracket around
+        it, found by doubling the distance from it until one side fits and the other doesn't.
+        Every bisection step yields the distribution for the most BD found to fit so far
+        '''
+        total_bd = self.total_bd if bd is None else bd
+        synergy_page = self.synergy_pages[page]
+        def bd_below(row_bd:int) -> Optional[np.ndarray]:
+            with self.time_phase("lower rows"):
+                return synergy_page.get_min_bd_below(row, row_bd, total_bd - row_bd, self.synergy_progress, self.synergy_power)
+        def distribution(row_bd:int, below:np.ndarray) -> np.ndarray:
+            bd_array = np.zeros(row, dtype=int)
+            bd_array[:row-1] = below
+            bd_array[row-1] = row_bd
+            bd_array[0] += total_bd - np.sum(bd_array)
+            return bd_array
+
+        low, high = 0, total_bd #low always fits, high might not
+        low_below = bd_below(low)
+        if hint_row_bd is not None and 0 < hint_row_bd <= total_bd:
+            hint_below = bd_below(hint_row_bd)
+            step = 1
+            if hint_below is not None:
+                low, low_below = hint_row_bd, hint_below
+                while low + step <= total_bd:
+                    step_below = bd_below(low + step)
+                    if step_below is None:
+                        high = low + step
+                        break
+                    low, low_below = low + step, step_below
+                    step *= 2
+            else:
+                high = hint_row_bd
+                while high - step > 0:
+                    step_below = bd_below(high - step)
+                    if step_below is not None:
+                        low, low_below = high - step, step_below
+                        break
+                    high -= step
+                    step *= 2
+        high_below = bd_below(high)
+        if high_below is not None:
+            low, low_below = high, high_below
+        yield self.evaluate_distribution(page, distribution(low, low_below))
+        iter = 0
+        while high - low > 1:
+            iter += 1
+            mid = (low + high) // 2
+            mid_below = bd_below(mid)
+            if mid_below is not None:
+                low, low_below = mid, mid_below
+                yield self.evaluate_distribution(page, distribution(low, low_below))
+            else:
+                high = mid
+            self.report_progress(iter, synergy_page.synergy_rows[row].calculate_gains_per_tick(low, self.synergy_progress, self.synergy_power)[0])
+        row_bd = low
+        _, _, speed_capped, overcapped = synergy_page.synergy_rows[row].calculate_gains_per_tick(row_bd, self.synergy_progress, self.synergy_power)
+        if speed_capped and overcapped > 0:
+            row_bd -= overcapped
+
+        bd_array = distribution(row_bd, bd_below(row_bd))
+        yield self.evaluate_distribution(page, bd_array)
+
+    def maximize_one_row_exact_steps(self, page:int, row:int, bd:Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        Branch and bound over the speed cap tiers of the desired row.
+        General algo is:
+            the desired row's gains only change at its tier thresholds once it is speed capped, and are linear below that,
+                so the only BD values worth trying are the thresholds, plus the break-even point in the linear region
+            try the thresholds from the best gains down. For each one, walk down the rows below, giving each row the fewest
+                BD that keep it non-negative. Each of those rows also only needs to check its own thresholds and
+                linear break-even point (see SynergyRow.calculate_bd_for_gains_from_tiers)
+            the first threshold that fits in total_bd is the best one, since every other candidate left has lower gains
+            if none of the thresholds fit, bisect for the break-even point in the linear region
+        Giving each lower row its fewest BD is always best, since it also keeps the consumption from the rows below it
+        as low as possible. So this gives the best integer allocation, and it does at most 10 walks plus one bisection.
+        Any BD left over goes into row 1, since nothing below it can go negative.
+        Until a threshold fits, the steps yield the empty distribution (everything in row 1), which is always valid
+        '''
+        total_bd = self.total_bd if bd is None else bd
+        synergy_page = self.synergy_pages[page]
+        synergy_row = synergy_page.synergy_rows[row]
+        def bd_below(row_bd:int) -> Optional[np.ndarray]:
+            with self.time_phase("lower rows"):
+                return synergy_page.get_min_bd_below(row, row_bd, total_bd - row_bd, self.synergy_progress, self.synergy_power, use_tiers=True)
+        def distribution(row_bd:int, below:np.ndarray) -> np.ndarray:
+            bd_array = np.zeros(row, dtype=int)
+            bd_array[:row-1] = below
+            bd_array[row-1] = row_bd
+            bd_array[0] += total_bd - np.sum(bd_array)
+            return bd_array
+
+        fallback = self.evaluate_distribution(page, distribution(0, bd_below(0)))
+        row_bd = None
+        iter = 0
+        #thresholds come out with the fewest ticks (best gains) first
+        for threshold_bd in synergy_row.calculate_tier_thresholds(self.synergy_progress):
+            iter += 1
+            self.report_progress(iter, 0)
+            if threshold_bd <= total_bd and bd_below(threshold_bd) is not None:
+                row_bd = threshold_bd
+                break
+            yield fallback
+        if row_bd is None:
+            #nothing speed capped fits, so bisect in the linear region
+            low = 0
+            high = min(total_bd, math.floor(synergy_row.current_progress/10/self.synergy_progress)) + 1
+            while high - low > 1:
+                iter += 1
+                mid = (low + high) // 2
+                mid_below = bd_below(mid)
+                if mid_below is not None:
+                    low = mid
+                    yield self.evaluate_distribution(page, distribution(low, mid_below))
+                else:
+                    high = mid
+                self.report_progress(iter, synergy_row.calculate_gains_per_tick(low, self.synergy_progress, self.synergy_power)[0])
+            row_bd = low
+
+        bd_array = distribution(row_bd, bd_below(row_bd))
+        yield self.evaluate_distribution(page, bd_array)
+
+    def sweep_maximize_one_row(self, page:int, row:int, bd_values:Iterable[int]) -> Iterator[SweepPoint]:
+        '''
+        Runs maximize_one_row for many numbers of BD, i.e. to see if buying more BD is worth it.
+        Results are yielded as they are found, from the fewest BD to the most.
+        The most BD the desired row can hold only goes up with the total number of BD, so each solution starts from
+        the last one: it doubles the BD on the desired row past the last amount until they no longer fit, and then
+        bisects in between, so only the marginal BD are searched over. Like the bisect solver, an overcapped desired row
+        is trimmed down to its min tick, and any BD left over goes into row 1
+        Params:
+            page: page of synergy to run, 1 indexed
+            row: row of synergy to run, 1 indexed
+            bd_values: numbers of BD to solve for
+        '''
+        synergy_page = self.synergy_pages[page]
+        synergy_row = synergy_page.synergy_rows[row]
+        low = 0 #most BD the desired row could hold with the last number of BD, which always fits with more
+        for iter, total_bd in enumerate(sorted(set(int(bd) for bd in bd_values))):
+            def bd_below(row_bd:int) -> Optional[np.ndarray]:
+                with self.time_phase("lower rows"):
+                    return synergy_page.get_min_bd_below(row, row_bd, total_bd - row_bd, self.synergy_progress, self.synergy_power)
+            step = 1
+            high = low + step
+            while high <= total_bd and bd_below(high) is not None:
+                low = high
+                step *= 2
+                high = low + step
+            high = min(high, total_bd + 1)
+            while high - low > 1:
+                mid = (low + high) // 2
+                if bd_below(mid) is not None:
+                    low = mid
+                else:
+                    high = mid
+            row_bd = low
+            _, _, speed_capped, overcapped = synergy_row.calculate_gains_per_tick(row_bd, self.synergy_progress, self.synergy_power)
+            if speed_capped and overcapped > 0:
+                row_bd -= overcapped
+            bd_array = np.zeros(row, dtype=int)
+            bd_array[:row-1] = bd_below(row_bd)
+            bd_array[row-1] = row_bd
+            bd_array[0] += total_bd - np.sum(bd_array)
+            point = SweepPoint(total_bd, *self.evaluate_distribution(page, bd_array))
+            self.report_progress(iter, point.gains_array[row-1])
+            yield point
+
+    def compare_maximize_solvers(self, page:int, row:int, solvers:Optional[List[str]] = None) -> Dict[str, Tuple[float, float]]:
+        '''
+        Runs maximize_one_row with several solvers on the same inputs, to check the faster solvers against the greedy one.
+        Prints a warning if any solver does worse than greedy on the desired row
+        Returns:
+            results: dictionary of solver name to (gains/tick on the desired row, time taken in s)
+        '''
+        if solvers is None:
+            solvers = ["greedy", "bisect", "exact"]
+        results = {}
+        for solver in solvers:
+            start_time = time.time()
+            _, gains_array, _ = self.maximize_one_row(page, row, solver)
+            results[solver] = (gains_array[row-1], time.time() - start_time)
+        if "greedy" in results:
+            greedy_gains = results["greedy"][0]
+            for solver, (gains, _) in results.items():
+                if gains < greedy_gains - 1e-9 * abs(greedy_gains):
+                    print(f"Warning: {solver} solver got {gains} gains/tick on row {row}, greedy got {greedy_gains}")
+        return results
+
+    def maximize_one_row_greedy_steps(self, page:int, row:int, bd:Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        Greedy algorithm to maximize the gains on one row.
+        General algo is:
+            start by assigning all BD to the desired row.
+            Then, iteratively move BD to the minimum row. It will always move BD from the row after the minimum row to 
+                the minimum row. This way, we should always keep as many BD as possible in the maximization row, since it will
+                only pull what is necessary.
+            If any row is speed capped (other than row 1), we can move that many BD down instead of 1
+        
+        Caps this iteration at max 5x the number of BD.
+        Lower rows are negative until the very end, so this first yields all BD in row 1, which is always valid, and then
+        only yields once every row is non-negative. Stops early once past the deadline, see iterate_steps
+        '''
+        total_bd = self.total_bd if bd is None else bd
+        bd_array = np.zeros(row, dtype=int)
+        bd_array[0] = total_bd
+        yield self.evaluate_distribution(page, bd_array.copy())
+        bd_array[0] = 0
+        bd_array[row-1] = total_bd
+        gains_array, speed_capped_array, overcapped_array = self.synergy_pages[page].get_all_gains_per_tick(bd_array, self.synergy_progress, self.synergy_power)
+        max_iter = 100*total_bd
+        iter = 0
+        previous_bd = None
+        def continue_function() -> bool:
+            #have general continuation check first
+            #then, if all rows are positive, but any row but the first is overcapped, continue on
+            # we want to minimize wasted BD
+            val = np.any(gains_array < 0) and iter < max_iter and bd_array is not previous_bd 
+            if not np.any(gains_array < 0) and np.any(overcapped_array[1:] != 0):
+                val = True
+
+            return val
+        
+        while continue_function():
+            if self.past_deadline():
+                return
+            iter += 1
+            previous_bd = bd_array.copy()
+            min_row = np.argmin(gains_array)
+            if min_row == row-1:
+                #nothing above the desired row to take BD from
+                break
+            max_row = min_row+1
+                    
+            if speed_capped_array[max_row] and overcapped_array[max_row] != 0:
+                bd_array[max_row] -= overcapped_array[max_row]
+                self.count("bd moves", int(overcapped_array[max_row]))
+                bd_array[min_row] += overcapped_array[max_row]
+            else:
+                bd_array[max_row] -= 1
+                self.count("bd moves")
+                bd_array[min_row] += 1
+            with self.time_phase("greedy moves"):
+                gains_array, speed_capped_array, overcapped_array = self.synergy_pages[page].get_all_gains_per_tick(bd_array, self.synergy_progress, self.synergy_power)
+            self.report_progress(iter, gains_array[row-1])
+            if not np.any(gains_array < 0):
+                yield self.evaluate_distribution(page, bd_array.copy())
+        
+        yield self.evaluate_distribution(page, bd_array)
+    
+    
+    @instrumented
+    def flat_up_to_row(self, page:int, row:int, bd:Optional[int] = None, solver:str = "waterfill", time_budget:Optional[float] = None,
+                       max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Tries to keep gains "flat" up to a certain row, so all of the gains/hour are roughly equal
+        Params:
+            page: page of synergy to run, 1 indexed
+            row: row of synergy to run, 1 indexed
+            bd: the number of bd to optimize with, defaults to total bd
+            solver: "waterfill" to search for a common gains level directly, or "greedy" for the original
+                one BD at a time algorithm, which is kept around as a reference
+            time_budget: optional most time to run for, in s
+            max_evaluations: optional most steps to run for
+                if either budget runs out, the best result so far is returned, and last_result.converged is False
+        Returns:
+            bd_array: bd distribution to maximize the desired row
+            gains_array: the final gains/tick of the distribution
+            syn_energy_per_tick: the sum of synergy energy gained per tick
+        '''
+        def make_steps(last_result:Optional[OptimizationResult]) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+            hint_gains = float(np.min(last_result.gains_array)) if last_result is not None else None
+            return self.flat_up_to_row_steps(page, row, bd, solver, hint_gains)
+        return self.run_cached(("flat_up_to_row", page, row, bd, solver), lambda: self.get_input_fingerprint(page, row, bd), make_steps,
+                               time_budget, max_evaluations)
+
+    def flat_up_to_row_steps(self, page:int, row:int, bd:Optional[int] = None, solver:str = "waterfill",
+                             hint_gains:Optional[float] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        if solver == "greedy":
+            return self.flat_up_to_row_greedy_steps(page, row, bd)
+        elif solver == "waterfill":
+            return self.flat_up_to_row_waterfill_steps(page, row, bd, hint_gains)
+        else:
+            raise ValueError(f"Unknown solver {solver}")
+
+    def flat_up_to_row_waterfill_steps(self, page:int, row:int, bd:Optional[int] = None,
+                                       hint_gains:Optional[float] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        Water-filling algorithm to keep gains flat up to a certain row.
+        General algo is:
+            pick a target gains/tick level, and walk down from the final row, finding the fewest BD each row needs to hit
+                that level on top of what the row above consumes (see SynergyPage.get_bd_for_flat_gains)
+            the BD needed only goes up with the target level, so bisect for the highest level that still fits in the BD
+            any BD left over goes into row 1, since nothing below it can go negative
+        Caps the bisection at 60 steps, so this is at most a few dozen page walks no matter how many BD there are.
+        If hint_gains is given (i.e. the level from before a level changed), the bisection starts from a bracket around
+        it, found by doubling the relative distance from it (starting at 1e-6) until one side fits and the other doesn't.
+        Every step that raises the level yields its distribution
+        '''
+        total_bd = self.total_bd if bd is None else bd
+        synergy_page = self.synergy_pages[page]
+        def bd_for_level(target_gains:float) -> Optional[np.ndarray]:
+            with self.time_phase("flat levels"):
+                return synergy_page.get_bd_for_flat_gains(row, target_gains, total_bd, self.synergy_progress, self.synergy_power)
+        def distribution(level_bd_array:np.ndarray) -> np.ndarray:
+            bd_array = level_bd_array.copy()
+            bd_array[0] += total_bd - np.sum(bd_array)
+            return bd_array
+
+        #the final row can never do better than holding every BD
+        low = 0
+        high, _, _, _ = synergy_page.synergy_rows[row].calculate_gains_per_tick(total_bd, self.synergy_progress, self.synergy_power)
+        bd_array = bd_for_level(low)
+        if hint_gains is not None and 0 < hint_gains < high:
+            hint_bd_array = bd_for_level(hint_gains)
+            step = 1e-6
+            if hint_bd_array is not None:
+                low, bd_array = hint_gains, hint_bd_array
+                while low * (1 + step) < high:
+                    step_bd_array = bd_for_level(low * (1 + step))
+                    if step_bd_array is None:
+                        high = low * (1 + step)
+                        break
+                    low, bd_array = low * (1 + step), step_bd_array
+                    step *= 2
+            else:
+                high = hint_gains
+                while step < 1:
+                    step_bd_array = bd_for_level(high * (1 - step))
+                    if step_bd_array is not None:
+                        low, bd_array = high * (1 - step), step_bd_array
+                        break
+                    high *= 1 - step
+                    step *= 2
+        yield self.evaluate_distribution(page, distribution(bd_array))
+        iter = 0
+        while iter < 60 and high - low > 1e-12 * high:
+            iter += 1
+            mid = (low + high) / 2
+            mid_bd_array = bd_for_level(mid)
+            if mid_bd_array is not None:
+                low = mid
+                bd_array = mid_bd_array
+                yield self.evaluate_distribution(page, distribution(bd_array))
+            else:
+                high = mid
+            self.report_progress(iter, low)
+
+        yield self.evaluate_distribution(page, distribution(bd_array))
+
+    def flat_up_to_row_greedy_steps(self, page:int, row:int, bd:Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        Greedy algorithm to try to keep gains "flat" up to a certain row.
+        This tries to get all of the gains/hour roughly equal
+        General algo is:
+            put all BD into the final row we want to be flat
+            find the row with the smallest gains/hour
+            take 1 (or overcapped) bd from the following row, and move it into that row
+            repeat until the final row we care about is the smallest gains/hour
+        
+        Caps this iteration at max 10x the number of BD.
+        First yields all BD in row 1, which is always valid, and then the distribution every 100 iterations, as soon as
+        no row is negative. Stops early once past the deadline, see iterate_steps
+        '''
+        bd_array = np.zeros(row, dtype=int)
+        bd_array[0] = self.total_bd if bd is None else bd
+        yield self.evaluate_distribution(page, bd_array.copy())
+        bd_array[0] = 0
+        bd_array[row-1] = self.total_bd if bd is None else bd
+        gains_array, speed_capped_array, overcapped_array = self.synergy_pages[page].get_all_gains_per_tick(bd_array, self.synergy_progress, self.synergy_power)
+        max_iter = 10*self.total_bd
+        iter = 0
+        previous_bd = None
+
+        while iter < max_iter:
+            if self.past_deadline():
+                return
+            iter += 1
+            min_row = np.argmin(gains_array)
+            if min_row ==  row-1:
+                #if the min row is ever the final one, stop there
+                break
+            take_row = min_row+1 #takes BD from the following row
+            if previous_bd is bd_array:
+                #stops any infinite loops
+                break
+            previous_bd = bd_array.copy()
+            if speed_capped_array[take_row] and overcapped_array[take_row] != 0:
+                bd_array[take_row] -= overcapped_array[take_row]
+                self.count("bd moves", int(overcapped_array[take_row]))
+                bd_array[min_row] += overcapped_array[take_row]
+            else:
+                bd_array[take_row] -= 1
+                self.count("bd moves")
+                bd_array[min_row] += 1
+            
+
+            with self.time_phase("greedy moves"):
+                gains_array, speed_capped_array, overcapped_array = self.synergy_pages[page].get_all_gains_per_tick(bd_array, self.synergy_progress, self.synergy_power)
+            self.report_progress(iter, np.min(gains_array))
+            if iter % 100 == 0 and not np.any(gains_array < 0):
+                yield self.evaluate_distribution(page, bd_array.copy())
+
+
+        bd_array = previous_bd if previous_bd is not None else bd_array
+        yield self.evaluate_distribution(page, bd_array)
+    
+    @instrumented
+    def see_maximization_one_page(self, page:int, time_budget:Optional[float] = None,
+                                  max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Optimization to show the user what gains are possible on a single page if synergy, if they were
+        to maximize any single row.
+        If the budget runs out, rows that weren't reached yet show 0 gains
+        Returns:
+            bd_array: array of 0 legth 7
+            gains_array: the final gains/tick for each row
+            syn_energy_per_tick: 0
+        '''
+        return self.run_cached(("see_maximization_one_page", page), lambda: self.get_input_fingerprint(page, 7),
+                               lambda last_result: self.see_maximization_one_page_steps(page), time_budget, max_evaluations)
+
+    def see_maximization_one_page_steps(self, page:int) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        gains_array = np.zeros(7)
+        for i in range(7):
+            _, gains_row, _ = self.run_steps(self.maximize_one_row_steps(page, i+1))
+            gains_array[i] = gains_row[i]
+            yield np.zeros(7, dtype=int), gains_array.copy(), 0
+    
+    @instrumented
+    def see_min_tick_one_page(self, page:int, time_budget:Optional[float] = None,
+                              max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Optimization to show the user how many BD are needed to min tick all rows on each page.
+        This doesnt take into account any lower or higher rows, just each row individually
+        '''
+        return self.run_cached(("see_min_tick_one_page", page), lambda: self.get_input_fingerprint(page, 7),
+                               lambda last_result: self.see_min_tick_one_page_steps(page), time_budget, max_evaluations)
+
+    def see_min_tick_one_page_steps(self, page:int) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        bd_array = np.zeros(7, dtype=int)
+        gains_array = np.zeros(7)
+        for i in range(7):
+            required_bd, gains_tick = self.synergy_pages[page].get_min_tick(i+1, self.total_bd, self.synergy_progress, self.synergy_power)
+            bd_array[i] = required_bd
+            gains_array[i] = gains_tick
+            self.report_progress(i, gains_tick)
+        yield bd_array, gains_array, 0
+    
+    @instrumented
+    def min_tick_row_flat_below(self, page:int, row:int, solver:str = "waterfill", time_budget:Optional[float] = None,
+                                max_evaluations:Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Does a min tick number of BD in the desired row, and then does a flat distribution below that row.
+        solver is passed through to flat_up_to_row
+        '''
+        return self.run_cached(("min_tick_row_flat_below", page, row, solver), lambda: self.get_input_fingerprint(page, row),
+                               lambda last_result: self.min_tick_row_flat_below_steps(page, row, solver), time_budget, max_evaluations)
+
+    def min_tick_row_flat_below_steps(self, page:int, row:int, solver:str = "waterfill") -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        final_row_bd, final_row_gains = self.synergy_pages[page].get_min_tick(row, self.total_bd, self.synergy_progress, self.synergy_power)
+        remaining_bd = self.total_bd - final_row_bd
+        if row == 1:
+            syn_energy, _, _ = self.synergy_pages[page].get_all_syn_energy_per_tick([final_row_bd], self.synergy_progress)
+            yield [final_row_bd], [final_row_gains], syn_energy
+        else:
+            #every step of the flat distribution below gives a valid distribution with the min ticked row on top
+            for bd_array, _, _ in self.flat_up_to_row_steps(page, row-1, remaining_bd, solver):
+                yield self.evaluate_distribution(page, np.hstack((bd_array, [final_row_bd])))
+
+    @instrumented
+    def maximize_energy_on_page(self, page:int, bd:Optional[int] = None, solver:str = "exact", non_negative:bool = False,
+                                time_budget:Optional[float] = None, max_evaluations:Optional[int] = None)-> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Maximizes the synergy energy on one page.
+        Params:
+            page: page of synergy to run, 1 indexed
+            bd: the number of bd to optimize with, defaults to total bd
+            solver: "exact" for the knapsack over each row's speed cap tiers, or "greedy" for the original algorithm,
+                which fills rows to min tick in order of energy efficiency
+            non_negative: only with the exact solver, keeps the gains/tick of every row non-negative. This is only exact
+                up to NON_NEGATIVE_TABLE_MAX_BD BD, and a heuristic for more (see maximize_energy_on_page_exact_steps)
+            time_budget: optional most time to run for, in s
+            max_evaluations: optional most steps to run for
+                if either budget runs out, the best result so far is returned, and last_result.converged is False
+        Returns:
+            bd_array: bd distribution to maximize synergy energy
+            gains_array: the final gains/tick of the distribution
+            syn_energy_per_tick: the sum of synergy energy gained per tick
+        '''
+        return self.run_cached(("maximize_energy_on_page", page, bd, solver, non_negative), lambda: self.get_input_fingerprint(page, 7, bd),
+                               lambda last_result: self.maximize_energy_on_page_steps(page, bd, solver, non_negative),
+                               time_budget, max_evaluations)
+
+    def maximize_energy_on_page_steps(self, page:int, bd:Optional[int] = None, solver:str = "exact",
+                                      non_negative:bool = False) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        if solver == "greedy":
+            return self.maximize_energy_on_page_greedy_steps(page, bd)
+        elif solver == "exact":
+            return self.maximize_energy_on_page_exact_steps(page, bd, non_negative)
+        else:
+            raise ValueError(f"Unknown solver {solver}")
+
+    def maximize_energy_on_page_exact_steps(self, page:int, bd:Optional[int] = None,
+                                            non_negative:bool = False) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        Solves for the most synergy energy on a page exactly, as a knapsack over the rows.
+        Each row's energy/tick only goes up in steps once it's speed capped, so the only BD worth putting on a row are
+        the smallest amounts that reach each speed cap tier (see TickLadder), or any amount below the speed cap, where
+        energy is linear in BD. General algo is:
+            moving BD between two rows that are partly filled below their speed caps only helps the one with the best
+                energy per BD, until it's full below its speed cap or the other one is empty. So at most one row is ever
+                partly filled, and every other row has 0 BD, the most BD below its speed cap, or a tier's min BD
+            those are the options of each row, and the best of every combination of options is found with a dynamic
+                program over the rows, keeping only the combinations that no other one beats on both BD used and
+                energy (see knapsack.py)
+            each row takes a turn as the partly filled row (and then no row does), gets as many of the BD left over
+                by each combination as fit below its speed cap, and the best of all of these is the answer
+        This is a few hundred to a few thousand combinations per row, so it runs in milliseconds for any number of BD.
+        With non_negative, each row also has to make up what the row above consumes, which ties each row to the next
+        one. Up to NON_NEGATIVE_TABLE_MAX_BD BD, this is solved exactly over every number of BD on each row
+        (see knapsack.get_chain_optimum). Above that, it's a heuristic (see get_energy_knapsack_non_negative), and any BD
+        left over go into row 1 if they fit below its speed cap, since row 1 doesn't consume anything
+        '''
+        synergy_page = self.synergy_pages[page]
+        budget = self.total_bd if bd is None else bd
+        rows = [synergy_page.synergy_rows[i+1] for i in range(7)]
+        def energy(row_index:int, number_bd:int) -> float:
+            if number_bd <= 0:
+                return 0.0
+            return rows[row_index].calculate_syn_energy_per_tick(int(number_bd), self.synergy_progress)[0]
+        #most BD each row can take below its speed cap, and the energy/tick each of those BD gives
+        linear_bd = [int(row.get_tick_ladder(self.synergy_progress, self.synergy_power).min_bd[0]) - 1 for row in rows]
+        linear_energy = [self.synergy_progress * row.synergy_energy_per_fill / row.current_progress for row in rows]
+        tier_bd = []
+        for row, row_linear_bd in zip(rows, linear_bd):
+            min_bd = row.get_tick_ladder(self.synergy_progress, self.synergy_power).min_bd
+            options = np.concatenate(([0, row_linear_bd], min_bd))
+            tier_bd.append(np.unique(options[(options >= 0) & (options <= budget)]))
+
+        if non_negative and budget <= NON_NEGATIVE_TABLE_MAX_BD:
+            values, gains, consume = np.zeros((3, 7, budget + 1))
+            with self.time_phase("knapsack"):
+                for i, row in enumerate(rows):
+                    for number_bd in range(1, budget + 1):
+                        values[i, number_bd] = energy(i, number_bd)
+                        gains[i, number_bd], consume[i, number_bd], _, _ = row.calculate_gains_per_tick(number_bd, self.synergy_progress,
+                                                                                                         self.synergy_power)
+                    self.report_progress(i, 0)
+                bd_array = get_chain_optimum(values, gains, consume, budget)
+        elif non_negative:
+            #rows that feed the ones above them can also be partly filled below their speed caps, so a few amounts
+            # spread out over that are options too
+            sample_bd = [np.unique(np.round(np.geomspace(1, row_linear_bd, 16)).astype(int)) if row_linear_bd > 0 else np.zeros(0, dtype=int)
+                         for row_linear_bd in linear_bd]
+            bd_array = self.get_energy_knapsack_non_negative(budget, rows, [np.union1d(tiers, samples[samples <= budget])
+                                                                            for tiers, samples in zip(tier_bd, sample_bd)], energy)
+            left_over_bd = budget - np.sum(bd_array)
+            if bd_array[0] <= linear_bd[0]:
+                bd_array[0] += max(0, min(left_over_bd, linear_bd[0] - bd_array[0]))
+        else:
+            best_value = -np.inf
+            bd_array = np.zeros(7, dtype=int)
+            with self.time_phase("knapsack"):
+                tier_energy = [[energy(i, tier) for tier in tier_bd[i]] for i in range(7)]
+                #frontiers of the first few rows are the same no matter which row comes after them, so they're only found once
+                first_rows = [get_empty_frontier()]
+                for i in range(7):
+                    first_rows.append(add_row_options(first_rows[-1], i, tier_bd[i], tier_energy[i], budget))
+                    self.count("knapsack states", len(first_rows[-1].costs))
+                for linear_row in [None] + list(range(7)):
+                    frontier = first_rows[7 if linear_row is None else linear_row]
+                    for i in range(7 if linear_row is None else linear_row + 1, 7):
+                        frontier = add_row_options(frontier, i, tier_bd[i], tier_energy[i], budget)
+                        self.count("knapsack states", len(frontier.costs))
+                    if linear_row is None:
+                        extra_bd = np.zeros(len(frontier.costs), dtype=np.int64)
+                        values = frontier.values
+                    else:
+                        extra_bd = np.minimum(budget - frontier.costs, linear_bd[linear_row])
+                        values = frontier.values + extra_bd * linear_energy[linear_row]
+                    best = int(np.argmax(values))
+                    if values[best] > best_value:
+                        best_value = values[best]
+                        bd_array = frontier.bd[best].copy()
+                        if linear_row is not None:
+                            bd_array[linear_row] = extra_bd[best]
+                    self.report_progress(0 if linear_row is None else linear_row + 1, best_value)
+        yield self.evaluate_distribution(page, bd_array.astype(int))
+
+    def get_energy_knapsack_non_negative(self, budget:int, rows:list, tier_bd:List[np.ndarray],
+                                         energy:Callable[[int, int], float]) -> np.ndarray:
+        '''
+        Heuristic knapsack for maximize_energy_on_page_exact_steps with every row kept non-negative, for more BD than
+        can be solved exactly. Rows are added from row 7 down. The options of each row are the ones it's given that
+        keep it non-negative, and the fewest BD that do that (see SynergyRow.calculate_bd_for_gains_from_tiers).
+        The frontiers are kept separately for each number of BD on the row just added, since that's what decides
+        how much the next row down has to make up. This is exact over those options, but BD amounts between them are
+        never tried, so it can miss the best distribution
+        '''
+        def gains(row_index:int, number_bd:int) -> Tuple[float, float]:
+            if number_bd <= 0:
+                return 0.0, 0.0
+            gains_per_tick, consume_per_tick, _, _ = rows[row_index].calculate_gains_per_tick(int(number_bd), self.synergy_progress,
+                                                                                             self.synergy_power)
+            return gains_per_tick, consume_per_tick
+
+        with self.time_phase("knapsack"):
+            groups:Dict[int, Frontier] = {0: get_empty_frontier()}
+            for i in range(6, -1, -1):
+                new_groups:Dict[int, List[Frontier]] = {}
+                for above_bd, frontier in groups.items():
+                    consumed = gains(i+1, above_bd)[1] if i < 6 else 0.0
+                    options = [int(tier) for tier in tier_bd[i] if gains(i, tier)[0] >= consumed]
+                    feed_bd = rows[i].calculate_bd_for_gains_from_tiers(consumed, budget, self.synergy_progress, self.synergy_power)
+                    if feed_bd is not None and feed_bd not in options and gains(i, feed_bd)[0] >= consumed:
+                        options.append(int(feed_bd))
+                    for option in options:
+                        new_frontier = add_row_options(frontier, i, [option], [energy(i, option)], budget)
+                        if len(new_frontier.costs) > 0:
+                            new_groups.setdefault(option, []).append(new_frontier)
+                groups = {option: merge_frontiers(frontiers) for option, frontiers in new_groups.items()}
+                self.count("knapsack states", sum(len(frontier.costs) for frontier in groups.values()))
+                self.report_progress(6 - i, max((np.max(frontier.values) for frontier in groups.values()), default=0))
+            frontier = merge_frontiers(list(groups.values()))
+        return frontier.bd[int(np.argmax(frontier.values))].copy()
+
+    def maximize_energy_on_page_greedy_steps(self, page:int, bd:Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, float]]:
+        '''
+        The original algorithm, which is kept around as a reference. Algo is:
+            -Get the ordering of the synergy rows based off of best energy efficiency
+            -For each row:
+                -throw remaining BD into it, and see if its overcapped
+                -set the final bd array for that row to be equal to the non-overcapped BD
+                -if the row was not overcapped, break
+                -if it was, set remaining BD to the overcapped BD and continue to the next best row
+            -after the BD array is acquired, calculate gains/synergy gains, and return
+        '''
+        row_efficiency_array = self.synergy_pages[page].get_energy_efficiency_order() #0 indexed, need to +1
+        bd_array = np.zeros(7, dtype=int)
+        remaining_bd = self.total_bd if bd is None else bd #counter for remaining BD
+
+        for best_row in row_efficiency_array:
+            _, _, speed_capped, overcapped = \
+                self.synergy_pages[page].synergy_rows[best_row+1].calculate_gains_per_tick(remaining_bd, self.synergy_progress, self.synergy_power)
+            bd_array[best_row] = remaining_bd - overcapped
+            self.report_progress(best_row, remaining_bd)
+            if overcapped == 0:
+                break
+            remaining_bd = overcapped
+        yield self.evaluate_distribution(page, bd_array)
+
+    @instrumented
+    def energy_gains_frontier(self, page:int, row:int, samples:int = 20, energy_samples:int = 10) -> List[FrontierPoint]:
+        '''
+        Finds the trade off between the gains on one row and the synergy energy of the page, from the
+        maximize_one_row distribution to the maximize_energy_on_page one. General algo is:
+            try a few dozen amounts of BD on the desired row: every speed cap tier threshold (where its gains step up),
+                samples amounts spaced geometrically below the speed cap, and the amount maximize_one_row ends up with
+            for each one, give the rows below it the fewest BD that keep them non-negative, like maximize_one_row does
+            spend some of the BD left over on energy, using the same efficiency order as maximize_energy_on_page, but
+                only on row 1 and the rows above the desired one, so the rows below it stay non-negative.
+                The rows above take from the desired row, so this tries energy_samples amounts, from none of the
+                left over BD to all of it. Any BD still left over goes into row 1
+            keep only the distributions that no other one beats on both gains and energy
+        This is a few hundred page evaluations at most, and doesn't depend on the number of BD.
+        Params:
+            page: page of synergy to run, 1 indexed
+            row: row of synergy to maximize the gains of, 1 indexed
+            samples: number of amounts of BD to try on the desired row below the speed cap
+            energy_samples: number of amounts of the left over BD to try spending on energy
+        Returns:
+            frontier: list of FrontierPoint, from the most row gains to the most synergy energy
+        '''
+        synergy_page = self.synergy_pages[page]
+        synergy_row = synergy_page.synergy_rows[row]
+        max_row_bd = int(self.maximize_one_row(page, row)[0][row-1])
+        candidates = {0, max_row_bd}
+        candidates.update(int(threshold_bd) for threshold_bd in synergy_row.calculate_tier_thresholds(self.synergy_progress)
+                          if threshold_bd <= max_row_bd)
+        linear_max_bd = min(max_row_bd, int(synergy_row.current_progress/10/self.synergy_progress))
+        if linear_max_bd > 0:
+            candidates.update(int(bd) for bd in np.round(np.geomspace(1, linear_max_bd, samples)))
+        energy_order = list(synergy_page.get_energy_efficiency_order()) #0 indexed
+
+        points = []
+        for iter, row_bd in enumerate(sorted(candidates)):
+            with self.time_phase("lower rows"):
+                below = synergy_page.get_min_bd_below(row, row_bd, self.total_bd - row_bd, self.synergy_progress,
+                                                      self.synergy_power, use_tiers=True)
+            if below is None:
+                continue
+            chain_bd_array = np.zeros(7, dtype=int)
+            chain_bd_array[:row-1] = below
+            chain_bd_array[row-1] = row_bd
+            left_over_bd = self.total_bd - np.sum(chain_bd_array)
+            energy_budgets = {0, left_over_bd}
+            if left_over_bd > 0:
+                energy_budgets.update(int(bd) for bd in np.round(np.geomspace(1, left_over_bd, energy_samples)))
+            for energy_bd in sorted(energy_budgets):
+                bd_array = chain_bd_array.copy()
+                remaining_bd = energy_bd
+                for best_row in energy_order:
+                    if remaining_bd <= 0:
+                        break
+                    if 0 < best_row < row:
+                        #BD on the rows in between would take more from the rows below them
+                        continue
+                    _, _, _, overcapped = synergy_page.synergy_rows[best_row+1].calculate_gains_per_tick(
+                        bd_array[best_row] + remaining_bd, self.synergy_progress, self.synergy_power)
+                    bd_array[best_row] += remaining_bd - overcapped
+                    remaining_bd = overcapped
+                bd_array[0] += remaining_bd + left_over_bd - energy_bd
+                bd_array, gains_array, syn_energy = self.evaluate_distribution(page, bd_array)
+                points.append(FrontierPoint(bd_array, gains_array, syn_energy, gains_array[row-1]))
+            self.report_progress(iter, row_bd)
+
+        #the pure energy distribution is the other end of the frontier, even if it leaves some lower rows negative
+        bd_array, gains_array, syn_energy = self.run_steps(self.maximize_energy_on_page_steps(page))
+        points.append(FrontierPoint(bd_array, gains_array, syn_energy, gains_array[row-1]))
+        return pareto_filter(points)
+
+    def run_objective(self, objective:PageObjective, bd:int) -> Tuple[np.ndarray, np.ndarray, float]:
+        '''
+        Runs the optimization of a page objective with a given number of BD, using the default solvers
+        '''
+        if objective.method == "maximize_one_row":
+            steps = self.maximize_one_row_steps(objective.page, objective.row, bd=bd)
+        elif objective.method == "flat_up_to_row":
+            steps = self.flat_up_to_row_steps(objective.page, objective.row, bd)
+        elif objective.method == "maximize_energy_on_page":
+            steps = self.maximize_energy_on_page_steps(objective.page, bd)
+        else:
+            raise ValueError(f"Unknown page objective {objective.method}")
+        return self.run_steps(steps)
+
+    def score_objective(self, objective:PageObjective, result:Tuple[np.ndarray, np.ndarray, float]) -> float:
+        '''
+        Returns the value of a page objective for an optimization result: the gains/tick of the maximized row,
+        the lowest gains/tick of a flat distribution, or the synergy energy/tick
+        '''
+        _, gains_array, syn_energy = result
+        if objective.method == "maximize_one_row":
+            return float(gains_array[objective.row-1])
+        elif objective.method == "flat_up_to_row":
+            return float(np.min(gains_array))
+        return float(syn_energy)
+
+    def get_response_curve(self, objective:PageObjective, samples:int = 40) -> ResponseCurve:
+        '''
+        Returns how the value of a page objective changes with the number of BD given to the page, from 0 up to total bd.
+        The curve is sampled at about samples BD counts, and kept until a level, multiplier or the total bd changes
+        '''
+        synergy_page = self.synergy_pages[objective.page]
+        key = (objective.page, objective.method, objective.row, self.total_bd, samples, tuple(synergy_page.get_all_levels()),
+               self.synergy_progress, self.synergy_power, self.synergy_energy)
+        curve = self.response_curves.get(key)
+        if curve is None:
+            sample_bd = get_sample_bd(self.total_bd, samples)
+            with self.time_phase("response curves"):
+                values = np.array([self.score_objective(objective, self.run_objective(objective, int(bd))) for bd in sample_bd])
+            #more BD can never make an objective worse, so this smooths out any noise from the integer solutions
+            curve = ResponseCurve(sample_bd, np.maximum.accumulate(values))
+            self.response_curves[key] = curve
+        return curve
+
+    @instrumented
+    def allocate_across_pages(self, objectives:List[PageObjective], resolution:int = 200, samples:int = 40) -> PageAllocation:
+        '''
+        Splits total bd across pages, and optimizes each page with its share. General algo is:
+            get the response curve of every page objective (see get_response_curve)
+            scale each curve by its value with all of the BD, so pages with bigger numbers don't drown out the rest,
+                and multiply it by the page's weight
+            split the BD into resolution equal steps, and find the best split of the steps on the interpolated curves
+                with a dynamic program (see page_allocation.allocate_grid)
+            refine the split by moving BD between pages, starting at one step and halving down to 1 BD, using the
+                real optimizer results this time
+            run each page's optimization with its final share
+        Params:
+            objectives: what to optimize on each page, at most one per page. Pages without one get no BD
+            resolution: number of BD steps for the dynamic program
+            samples: number of BD counts to sample each response curve at
+        Returns:
+            allocation: PageAllocation with the BD given to each page, each page's results, and the total score
+        '''
+        objectives = [objective for objective in objectives if objective.weight > 0]
+        if len(objectives) == 0:
+            raise ValueError("No page objectives with a positive weight")
+        if len({objective.page for objective in objectives}) != len(objectives):
+            raise ValueError("Only one objective per page is allowed")
+        total_bd = self.total_bd
+        curves = [self.get_response_curve(objective, samples) for objective in objectives]
+        #value of each objective with all of the BD, used to put them on the same scale
+        scales = [curve.values[-1] if curve.values[-1] > 0 else 1 for curve in curves]
+
+        number_steps = max(1, min(resolution, total_bd))
+        step_bd = np.linspace(0, total_bd, number_steps + 1)
+        scores = [objective.weight * curve.value_at(step_bd) / scale for objective, curve, scale in zip(objectives, curves, scales)]
+        with self.time_phase("split search"):
+            steps, _ = allocate_grid(scores)
+        split = [int(round(step * total_bd / number_steps)) for step in steps]
+        split[int(np.argmax(split))] += total_bd - sum(split)
+
+        results = {}
+        def evaluate(page_index:int, bd:int) -> float:
+            if (page_index, bd) not in results:
+                results[(page_index, bd)] = self.run_objective(objectives[page_index], bd)
+            objective = objectives[page_index]
+            return objective.weight * self.score_objective(objective, results[(page_index, bd)]) / scales[page_index]
+        def total_score(split:List[int]) -> float:
+            return sum(evaluate(i, bd) for i, bd in enumerate(split))
+
+        best_score = total_score(split)
+        move_bd = max(1, total_bd // number_steps)
+        with self.time_phase("refine split"):
+            while move_bd >= 1:
+                improved = True
+                while improved:
+                    improved = False
+                    for give in range(len(split)):
+                        for take in range(len(split)):
+                            if give == take or split[give] < move_bd:
+                                continue
+                            candidate = split.copy()
+                            candidate[give] -= move_bd
+                            candidate[take] += move_bd
+                            candidate_score = total_score(candidate)
+                            if candidate_score > best_score + 1e-12:
+                                split, best_score = candidate, candidate_score
+                                improved = True
+                    self.report_progress(move_bd, best_score)
+                move_bd //= 2
+
+        return PageAllocation({objective.page: bd for objective, bd in zip(objectives, split)},
+                              {objective.page: results[(i, bd)] for i, (objective, bd) in enumerate(zip(objectives, split))},
+                              best_score)
+
+    def score_trajectory(self, objective:PageObjective, trajectory:HorizonTrajectory) -> float:
+        '''
+        Returns the value of a page objective at the end of a projection: the bonus of the maximized row,
+        the lowest bonus up to the flat row, or the total synergy energy gained
+        '''
+        if objective.method == "maximize_one_row":
+            return float(trajectory.bonus[objective.row-1, -1])
+        elif objective.method == "flat_up_to_row":
+            return float(np.min(trajectory.bonus[:objective.row, -1]))
+        return float(trajectory.syn_energy[-1])
+
+    @instrumented
+    def plan_reassignments(self, objective:PageObjective, hours:float, interval:float, samples:int = 101) -> ReassignmentPlan:
+        '''
+        Plans a schedule of BD distributions for one page over the next few hours, with the BD moved around every interval
+        hours, instead of keeping one distribution the whole time. Rows fill and level up over a long run, so the
+        best distribution changes. This is a rolling horizon search, using the closed form projections
+        (see simulate_horizon) between reassignments. General algo is:
+            at every reassignment, project the levels and points of the page at that time under the plan so far
+            candidates are the objective's static optimum for those levels, and the static optimum for the levels
+                the page would be at by the next reassignment with the first one, so the plan gets ahead of level ups
+            score each candidate by projecting it kept until the end of the horizon (see score_trajectory),
+                and switch to the best one if it beats keeping the current distribution
+        Keeping the current distribution is always an option, so the plan is never projected to end up worse than
+        keeping the first static optimum, if that one is feasible. Bars are projected to start empty whenever the
+        distribution changes, so the partial fills lost to a change count against making it.
+        A candidate whose projection takes any row below 0 points (see is_feasible) is never picked. If neither
+        candidate is feasible at the start, the plan starts with the static optimum anyway, and comes back with
+        feasible set to False.
+        Each reassignment is at most 2 optimizations and 5 projections, no matter how long the plan is. The optimizations
+        only depend on the levels, so they are only run once for each set of levels the page is projected to reach
+        Params:
+            objective: what to optimize on the page, see PageObjective. Its weight isn't used
+            hours: how far ahead to plan
+            interval: hours between reassignments
+            samples: number of evenly spaced times to sample the plan's trajectory at, including the start and the end
+        Returns:
+            plan: ReassignmentPlan with the distributions to use, the projection of the plan, and its value
+        '''
+        page = objective.page
+        #the projected states are set on a copy, so nothing here changes the inputs or notifies listeners
+        planner = SynergyModel.from_state_dict(self.get_state_dict())
+        planner.verbose = False
+        planner_page = planner.synergy_pages[page]
+
+        def set_state(state:tuple):
+            '''
+            Sets the page to a state of (levels, points, synergy energy so far)
+            '''
+            levels, points, _ = state
+            with planner.batch_updates():
+                planner_page.update_all_levels([int(round(level)) for level in levels])
+                planner_page.update_all_points(list(points))
+
+        def project(state:tuple, bd_array:np.ndarray, hours:float, samples:int = 2) -> HorizonTrajectory:
+            '''
+            Projects the page from a state of (levels, points, synergy energy so far), starting with empty bars
+            '''
+            set_state(state)
+            self.count("projections")
+            trajectory = planner.simulate_horizon(page, bd_array, hours, samples)
+            return trajectory._replace(syn_energy=trajectory.syn_energy + state[2])
+
+        def end_state(trajectory:HorizonTrajectory) -> tuple:
+            return trajectory.levels[:, -1], trajectory.points[:, -1], trajectory.syn_energy[-1]
+
+        def score(state:tuple, trajectory:HorizonTrajectory) -> float:
+            if not self.is_feasible(trajectory, state[1]):
+                self.count("infeasible candidates")
+                return -np.inf
+            return self.score_trajectory(objective, trajectory)
+
+        optima:Dict[tuple, np.ndarray] = {} #static optimum for each set of levels, points don't change it
+        def optimize(state:tuple) -> np.ndarray:
+            levels = tuple(int(round(level)) for level in state[0])
+            if levels in optima:
+                self.count("repeated optimizations")
+            else:
+                set_state(state)
+                with self.time_phase("static optimizations"):
+                    optima[levels] = planner.run_objective(objective, planner.total_bd)[0]
+            return optima[levels]
+
+        start_state = (self.synergy_pages[page].get_all_levels(), self.synergy_pages[page].get_all_points(), 0.0)
+        number_steps = max(1, math.ceil(hours / interval - 1e-9))
+        plan:List[ReassignmentStep] = []
+        segment_state = start_state #state when the last step of the plan starts
+        static_value = None
+        for step in range(number_steps):
+            start_hours = step * interval
+            next_hours = min((step + 1) * interval, hours)
+            if len(plan) > 0:
+                state = end_state(project(segment_state, plan[-1].bd_array, start_hours - plan[-1].hours))
+                best_value = score(segment_state, project(segment_state, plan[-1].bd_array, hours - plan[-1].hours))
+            else:
+                state = start_state
+                best_value = -np.inf
+            candidates = [optimize(state)]
+            candidates.append(optimize(end_state(project(state, candidates[0], next_hours - start_hours))))
+            best_bd_array = None
+            for bd_array in candidates:
+                if len(plan) > 0 and np.array_equal(bd_array, plan[-1].bd_array):
+                    continue
+                trajectory = project(state, bd_array, hours - start_hours)
+                value = score(state, trajectory)
+                if static_value is None:
+                    static_value = self.score_trajectory(objective, trajectory)
+                if value > best_value:
+                    best_bd_array, best_value = bd_array, value
+            if len(plan) == 0 and best_bd_array is None:
+                #nothing is feasible from the start, so keep the static optimum, and the plan comes back infeasible
+                best_bd_array = candidates[0]
+            if best_bd_array is not None:
+                set_state(state)
+                plan.append(ReassignmentStep(start_hours, *planner.evaluate_distribution(page, best_bd_array)))
+                segment_state = state
+            self.report_progress(step, best_value)
+
+        #the whole projection, sampled evenly and with fills and energy counted from the start
+        sample_hours = np.linspace(0, hours, samples)
+        starts = [plan_step.hours for plan_step in plan] + [hours]
+        parts = []
+        state = start_state
+        fills = np.zeros(7)
+        for i, plan_step in enumerate(plan):
+            in_step = sample_hours[(sample_hours >= starts[i]) & (sample_hours < starts[i+1])] - starts[i]
+            ticks = 36000 * np.concatenate((in_step, [starts[i+1] - starts[i]]))
+            levels, points, syn_energy = state
+            with planner.batch_updates():
+                planner_page.update_all_levels([int(round(level)) for level in levels])
+                planner_page.update_all_points(list(points))
+            trajectory = planner_page.simulate_horizon(plan_step.bd_array, ticks, planner.synergy_progress, planner.synergy_power)
+            trajectory = trajectory._replace(ticks=trajectory.ticks + 36000 * starts[i], fills=trajectory.fills + fills[:, None],
+                                             syn_energy=trajectory.syn_energy * planner.synergy_energy + syn_energy)
+            state = end_state(trajectory)
+            fills = trajectory.fills[:, -1]
+            #the last sample of each step is where the next one starts, so it's only kept for the last step
+            parts.append(trajectory if i == len(plan) - 1 else HorizonTrajectory(trajectory.ticks[:-1],
+                         *(array[:, :-1] for array in trajectory[1:5]), trajectory.syn_energy[:-1]))
+        trajectory = HorizonTrajectory(np.concatenate([part.ticks for part in parts]),
+                                       *(np.concatenate([part[j] for part in parts], axis=1) for j in range(1, 5)),
+                                       np.concatenate([part.syn_energy for part in parts]))
+        return ReassignmentPlan(plan, trajectory, self.score_trajectory(objective, trajectory), static_value,
+                                self.is_feasible(trajectory, start_state[1]))
+
+    @staticmethod
+    def is_feasible(trajectory:HorizonTrajectory, start_points:Sequence[float]) -> bool:
+        '''
+        Returns True if no row of a projection goes below 0 points, or below the points it started at if those
+        were already below 0
+        '''
+        floor = np.minimum(np.asarray(start_points, dtype=float), 0)
+        return bool(np.all(trajectory.points >= floor[:, None]))
+
+    def get_target_points(self, page:int, row:int, target_bonus:float) -> float:
+        return self.synergy_pages[page].synergy_rows[row].calculate_points_for_bonus(target_bonus)
+
+    @instrumented
+    def min_bd_for_bonus(self, page:int, row:int, target_bonus:float, hours:float, max_bd:int = 10**15,
+                         level_ups:bool = True) -> TargetResult:
+        '''
+        Finds the fewest BD that get a row to a bonus within some hours, using the maximize_one_row distribution.
+        General algo is:
+            invert the row's bonus to the points it needs (see SynergyRow.calculate_points_for_bonus)
+            for a number of BD, run maximize_one_row with them, and project the row's points after hours
+                (see simulate_horizon)
+            if the row already reaches the target with 0 BD, that's the answer. Otherwise, double the BD until the
+                target is reached, then bisect between the last two amounts
+        More BD never lower maximize_one_row's gains on the row, so this takes about 2 * log2(BD needed) optimizations
+        Params:
+            page: page of synergy to run, 1 indexed
+            row: row of synergy to reach the bonus on, 1 indexed
+            target_bonus: multiplicative bonus to reach, like calculate_bonus returns
+            hours: hours to reach it in
+            max_bd: most BD to try
+            level_ups: whether or not every fill raises the row's level by 1
+        Returns:
+            result: TargetResult with the fewest BD and their distribution
+        '''
+        target_points = self.get_target_points(page, row, target_bonus)
+        results = {}
+        def reaches(total_bd:int) -> bool:
+            if total_bd not in results:
+                hint_row_bd = int(results[max(results)][0][row-1]) if len(results) > 0 else None
+                with self.time_phase("optimizations"):
+                    result = self.run_steps(self.maximize_one_row_steps(page, row, "bisect", total_bd, hint_row_bd))
+                with self.time_phase("projections"):
+                    trajectory = self.simulate_horizon(page, result[0], hours, samples=2, level_ups=level_ups)
+                self.count("target checks")
+                results[total_bd] = (*result, trajectory.points[row-1, -1] >= target_points)
+            return results[total_bd][3]
+
+        if reaches(0):
+            #the row already gets there on its own
+            bd_array, gains_array, syn_energy, _ = results[0]
+            return TargetResult(0, hours, bd_array, gains_array, syn_energy, True)
+        low, high = 0, min(1, max_bd)
+        while not reaches(high):
+            low = high
+            if high >= max_bd:
+                bd_array, gains_array, syn_energy, _ = results[high]
+                return TargetResult(high, hours, bd_array, gains_array, syn_energy, False)
+            high = min(2 * high, max_bd)
+            self.report_progress(len(results), high)
+        while high - low > 1:
+            mid = (low + high) // 2
+            if reaches(mid):
+                high = mid
+            else:
+                low = mid
+            self.report_progress(len(results), high)
+        bd_array, gains_array, syn_energy, _ = results[high]
+        return TargetResult(high, hours, bd_array, gains_array, syn_energy, True)
+
+    @instrumented
+    def hours_for_bonus(self, page:int, row:int, target_bonus:float, bd:Optional[int] = None, max_hours:float = 24 * 365,
+                        level_ups:bool = True) -> TargetResult:
+        '''
+        Finds how long the maximize_one_row distribution takes to get a row to a bonus.
+        The row's points are projected at evenly spaced times up to max_hours in one closed form projection, and the
+        interval the target is first reached in is split the same way, until it's down to one tick. Since each split
+        cuts the interval by a factor of 1000, this is about 3 projections
+        Params:
+            page: page of synergy to run, 1 indexed
+            row: row of synergy to reach the bonus on, 1 indexed
+            target_bonus: multiplicative bonus to reach, like calculate_bonus returns
+            bd: the number of bd to use, defaults to total bd
+            max_hours: longest time to look
+            level_ups: whether or not every fill raises the row's level by 1
+        Returns:
+            result: TargetResult with the hours it takes, rounded up to the next tick
+        '''
+        target_points = self.get_target_points(page, row, target_bonus)
+        bd_array, gains_array, syn_energy = self.run_steps(self.maximize_one_row_steps(page, row, "bisect", bd))
+        total_bd = int(np.sum(bd_array))
+        synergy_page = self.synergy_pages[page]
+        low, high = 0.0, math.ceil(36000 * max_hours)
+        if synergy_page.synergy_rows[row].current_points >= target_points:
+            return TargetResult(total_bd, 0.0, bd_array, gains_array, syn_energy, True)
+        while True:
+            ticks = np.unique(np.round(np.linspace(low, high, 1001)))
+            with self.time_phase("projections"):
+                trajectory = synergy_page.simulate_horizon(bd_array, ticks, self.synergy_progress, self.synergy_power, level_ups)
+            self.count("projections")
+            reached = np.flatnonzero(trajectory.points[row-1] >= target_points)
+            if len(reached) == 0:
+                return TargetResult(total_bd, max_hours, bd_array, gains_array, syn_energy, False)
+            if reached[0] == 0:
+                break
+            low, high = ticks[reached[0] - 1], ticks[reached[0]]
+            if high - low <= 1:
+                break
+        return TargetResult(total_bd, high / 36000, bd_array, gains_array, syn_energy, True)
+
+    @instrumented
+    def what_if_grid(self, objective:PageObjective, grid:Optional[Dict[str, Sequence]] = None, steps:int = 1,
+                     bd:Optional[int] = None) -> List[WhatIfResult]:
+        '''
+        Ranks what changing the multiplier inputs (trophies, potion, soul purchase, perks, pomos levels, max stage,
+        adventure items) would do for a page objective. General algo is:
+            take the Cartesian product of the values of every input on the grid, with the rest kept as they are
+            calculate the multipliers of every point on the grid at once, with numpy broadcasting (see what_if.py)
+            run the objective's optimization once for every different set of multipliers it depends on, since many
+                upgrades share them. Energy distributions only depend on the progress multiplier, and the others on
+                the progress multiplier and the points each row gets per fill (round(level * power)).
+                The energy multiplier only scales the synergy energy of a distribution
+            evaluate the gains of every point's distribution at its own multipliers, all in one batch
+                (see SynergyPage.get_all_gains_per_tick_batch)
+            rank the points by the objective's value, relative to its value with the current inputs
+        Params:
+            objective: what to optimize on the page, see PageObjective. Its weight isn't used
+            grid: values to try for each input, named as in the inputs dict (see what_if.MULTIPLIER_INPUTS).
+                Defaults to every upgrade up to steps upgrades away, see what_if.get_upgrade_grid
+            steps: number of upgrades of the leveled inputs to try, when no grid is given
+            bd: the number of bd to optimize with, defaults to total bd
+        Returns:
+            results: WhatIfResult of every point on the grid, from the biggest gain to the smallest
+        '''
+        bd = self.total_bd if bd is None else bd
+        base_inputs = self.get_inputs_dict()
+        if grid is None:
+            grid = get_upgrade_grid(base_inputs, steps)
+        with self.time_phase("multipliers"):
+            inputs, size = get_input_grid(base_inputs, grid)
+            multipliers = np.stack([np.broadcast_to(calculate(inputs), size) for calculate in
+                                    (calculate_progress_multiplier, calculate_power_multiplier, calculate_energy_multiplier)], axis=1)
+            #what the optimized distribution depends on, for every point on the grid
+            if objective.method == "maximize_energy_on_page":
+                dependencies = multipliers[:, :1]
+            else:
+                levels = np.array(self.synergy_pages[objective.page].get_all_levels(), dtype=float)
+                dependencies = np.hstack((multipliers[:, :1], np.round(multipliers[:, 1:2] * levels)))
+            _, first_index, inverse = np.unique(dependencies, axis=0, return_index=True, return_inverse=True)
+            inverse = inverse.ravel()
+        self.count("grid points", size)
+        self.count("optimizations", len(first_index))
+
+        #the multipliers are set on a copy, so nothing here changes the inputs or notifies listeners
+        planner = SynergyModel.from_state_dict(self.get_state_dict())
+        planner.verbose = False
+        planner.set_synergy_energy(1.0)
+        def optimize(progress:float, power:float) -> Tuple[np.ndarray, np.ndarray, float]:
+            planner.set_synergy_progress(progress)
+            planner.set_syngery_power(power)
+            with self.time_phase("optimizations"):
+                return planner.run_objective(objective, bd)
+
+        bd_array, gains_array, syn_energy = optimize(self.synergy_progress, self.synergy_power)
+        base_score = self.score_objective(objective, (bd_array, gains_array, syn_energy * self.synergy_energy))
+        base_score = base_score if base_score != 0 else 1
+        optimized = []
+        for iter, index in enumerate(first_index):
+            optimized.append(optimize(float(multipliers[index, 0]), float(multipliers[index, 1])))
+            self.report_progress(iter, len(first_index))
+
+        with self.time_phase("evaluate results"):
+            bd_matrix = np.array([optimized[group][0] for group in inverse])
+            gains_matrix, _, _, _ = self.synergy_pages[objective.page].get_all_gains_per_tick_batch(
+                bd_matrix, multipliers[:, 0], multipliers[:, 1])
+        results = []
+        for i in range(size):
+            changes = {name: inputs[name][i].item() for name in grid if inputs[name][i] != base_inputs[name]}
+            progress, power, energy = (float(multiplier) for multiplier in multipliers[i])
+            result = (bd_matrix[i], gains_matrix[i], optimized[inverse[i]][2] * energy)
+            score = self.score_objective(objective, result)
+            results.append(WhatIfResult(changes, progress, power, energy, *result, score, score / base_score))
+        return rank_results(results)
@@ -0,0 +1,303 @@
+import contextlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from synergy_core.synergy_row import SynergyRow
+from synergy_core.bonus import calculate_bonus_array
+from synergy_core.row_evaluation_cache import RowEvaluationCache
+from synergy_core.horizon import HorizonTrajectory
+
+#number of evenly spaced times simulate_horizon checks for rows running dry at, on top of the sample times
+HORIZON_GRID_SIZE = 1025
+
+class SynergyPage:
+    '''
+    Class to hold a single page of synergy.
+    This has a dictionary holding each of the underlying synergy rows, and has some extra functions related to 
+    helping out optimizations
+    '''
+    __slots__ = ("page", "synergy_rows", "evaluations")
+
+    def __init__(self, page:int, initial_levels:list, initial_points:list, row_cache:Optional[RowEvaluationCache] = None):
+        self.page = page
+        self.synergy_rows:Dict[int, SynergyRow] = {}
+        self.evaluations = 0 #number of full page evaluations, for benchmarking
+
+        for i in range(7):
+            self.synergy_rows[i+1] = SynergyRow(self.page, i+1, initial_levels[i], initial_points[i], row_cache)
+
+    def update_level(self, row:int, new_level:int):
+        '''
+        pass through function to update the level for a single row
+        '''
+        self.synergy_rows[row].set_level(new_level)
+
+    def invalidate_tick_ladders(self):
+        '''
+        Drops the cached tick ladders of every row, i.e. when the progress multiplier changes
+        '''
+        for _, synergy_row in self.synergy_rows.items():
+            synergy_row.invalidate_tick_ladder()
+
+    def begin_batch(self):
+        for _, synergy_row in self.synergy_rows.items():
+            synergy_row.begin_batch()
+
+    def end_batch(self):
+        for _, synergy_row in self.synergy_rows.items():
+            synergy_row.end_batch()
+
+    @contextlib.contextmanager
+    def batch_updates(self):
+        '''
+        Context manager that holds back every row's change notifications, and reports each changed value once at the end
+        (see SynergyRow.begin_batch)
+        '''
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    def update_all_levels(self, all_levels:list):
+        for i in range(7):
+            self.synergy_rows[i+1].set_level(all_levels[i])
+    def update_all_points(self, all_points:list):
+        for i in range(7):
+            self.synergy_rows[i+1].set_current_points(all_points[i])
+
+    def get_all_gains_per_tick(self, baby_demon_array:List[int], progress_mult:float, power_mult:float):
+        '''
+        Function to get all gains for a single page of synergy.
+        As a note for future reference, there are 10 ticks/second, so 36000 ticks in an hour
+        Params:
+            -----
+            baby_demon_array: list of baby demons to apply to each row of synergy
+            progress_mult: progress mutliplier
+            power_mult: power multiplier
+        '''
+        self.evaluations += 1
+        number_rows = len(baby_demon_array)
+        gains_array = np.zeros(number_rows)
+        speed_capped_array = [False] * number_rows
+        overcapped_array = np.zeros(number_rows)
+        for i in range(len(baby_demon_array)):
+            gains, consume, speed_capped, overcapped = self.synergy_rows[i+1].calculate_gains_per_tick(baby_demon_array[i], progress_mult, power_mult)
+            gains_array[i] = gains 
+            if i != 0:
+                gains_array[i-1] = gains_array[i-1] - consume
+            speed_capped_array[i] = speed_capped
+            overcapped_array[i] = overcapped
+        return gains_array, speed_capped_array, overcapped_array
+
+    def get_all_gains_per_tick_batch(self, baby_demon_matrix:np.ndarray, progress_mult, power_mult
+                                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Vectorized version of get_all_gains_per_tick, which evaluates many BD distributions at once.
+        Each row of the input matrix is one candidate distribution, and each column is a row of synergy, starting at row 1.
+        This follows the exact same math as SynergyRow.calculate_gains_per_tick, just done with numpy over all
+        candidates at the same time
+        Params:
+            -----
+            baby_demon_matrix: N x rows array of baby demons, one candidate distribution per line
+            progress_mult: progress mutliplier, or an array of N of them, one per candidate
+            power_mult: power multiplier, or an array of N of them, one per candidate
+        Returns:
+            ----
+            gains_matrix: N x rows array of the net gains/tick (gains minus what the next row consumes)
+            consume_matrix: N x rows array of how much each row consumes from the row before it per tick
+            speed_capped_matrix: N x rows bool array showing which rows are speed capped
+            overcapped_matrix: N x rows array of how many BD each speed capped row is overcapping by
+        '''
+        bd = np.atleast_2d(np.asarray(baby_demon_matrix, dtype=np.int64))
+        self.evaluations += bd.shape[0]
+        number_rows = bd.shape[1]
+        current_progress = np.array([self.synergy_rows[i+1].current_progress for i in range(number_rows)], dtype=float)
+        levels = np.array([self.synergy_rows[i+1].level for i in range(number_rows)], dtype=float)
+        #multipliers are turned into columns, so a single one applies to every candidate and an array gives one each
+        progress_mult = np.reshape(np.asarray(progress_mult, dtype=float), (-1, 1))
+        power_mult = np.reshape(np.asarray(power_mult, dtype=float), (-1, 1))
+        #python's round and numpy's round both round half to even, so this matches the scalar version
+        points_per_fill = np.round(levels * power_mult)
+
+        points_per_tick = bd * progress_mult
+        speed_capped = points_per_tick > current_progress / 10
+        #only capped entries use the tick calculation, the rest get a dummy value of 1 to avoid dividing by 0
+        ticks_to_fill = np.ceil(current_progress / np.where(speed_capped, points_per_tick, 1.0))
+        ticks_to_fill = np.where(speed_capped, ticks_to_fill, 1.0)
+
+        gains = np.where(speed_capped, points_per_fill / ticks_to_fill, points_per_tick * points_per_fill / current_progress)
+        consume = np.where(speed_capped, levels * 2 / ticks_to_fill, points_per_tick * levels * 2 / current_progress)
+        required_bd = np.ceil((current_progress / progress_mult) / ticks_to_fill)
+        overcapped = np.where(speed_capped, bd - required_bd, 0).astype(np.int64)
+
+        #each row consumes from the row before it
+        gains[:, :-1] -= consume[:, 1:]
+        return gains, consume, speed_capped, overcapped
+
+    def get_all_syn_energy_per_tick(self, baby_demon_array:List[int], progress_mult:float):
+        '''
+        Function to get all syn energy for a single page of synergy.
+        As a note for future reference, there are 10 ticks/second, so 36000 ticks in an hour
+        Params:
+            -----
+            baby_demon_array: list of baby demons to apply to each row of synergy
+            progress_mult: progress mutliplier
+        '''
+        number_rows = len(baby_demon_array)
+        speed_capped_array = [False] * number_rows
+        overcapped_array = np.zeros(number_rows)
+        syn_energy_total = 0
+        for i, bd in enumerate(baby_demon_array):
+            if bd == 0:
+                speed_capped_array[i] = False
+                overcapped_array[i] = 0
+            else:
+                syn_energy_row, speed_capped, overcapped = self.synergy_rows[i+1].calculate_syn_energy_per_tick(bd, progress_mult)
+                syn_energy_total += syn_energy_row
+                speed_capped_array[i] = speed_capped
+                overcapped_array[i] = overcapped
+        return syn_energy_total, speed_capped_array, overcapped_array
+    
+    def get_min_tick(self, row:int, baby_demon_available:int, progress_mult:int, power_mult:int) -> Tuple[int, float]:
+        '''
+        Given a row and number of BD to use, returns the number of BD needed to not overcap that row, as well as the
+        gains/tick resulting from this distribution
+        '''
+        required_bd = self.synergy_rows[row].calculate_bd_for_min_tick(baby_demon_available, progress_mult)
+        gains_tick,_, _, _ = self.synergy_rows[row].calculate_gains_per_tick(required_bd, progress_mult, power_mult)
+        return required_bd, gains_tick
+    
+    def get_min_bd_below(self, row:int, row_bd:int, max_bd:int, progress_mult:float, power_mult:float,
+                         use_tiers:bool = False) -> Optional[np.ndarray]:
+        '''
+        Given a number of BD on a row, walks down the rows below it and finds the smallest number of BD each one needs
+        so that its gains/tick are barely non-negative after the row above consumes from it.
+        Since gains and consumption both only go up with more BD, the smallest BD on each row is also what keeps
+        the rows further below as cheap as possible
+        Params:
+            -----
+            row: row with the fixed number of BD, 1 indexed
+            row_bd: number of BD on that row
+            max_bd: most BD that can be spent on the rows below
+            use_tiers: if true, each row only checks its tier thresholds and linear break-even point
+                (SynergyRow.calculate_bd_for_gains_from_tiers) instead of bisecting
+        Returns:
+            ----
+            bd_array: bd for rows 1 to row-1, or None if max_bd isn't enough to keep them non-negative
+        '''
+        bd_array = np.zeros(row-1, dtype=int)
+        _, consume, _, _ = self.synergy_rows[row].calculate_gains_per_tick(row_bd, progress_mult, power_mult)
+        remaining_bd = max_bd
+        for i in range(row-1, 0, -1):
+            if use_tiers:
+                required_bd = self.synergy_rows[i].calculate_bd_for_gains_from_tiers(consume, remaining_bd, progress_mult, power_mult)
+            else:
+                required_bd = self.synergy_rows[i].calculate_bd_for_gains(consume, remaining_bd, progress_mult, power_mult)
+            if required_bd is None:
+                return None
+            bd_array[i-1] = required_bd
+            remaining_bd -= required_bd
+            _, consume, _, _ = self.synergy_rows[i].calculate_gains_per_tick(required_bd, progress_mult, power_mult)
+        return bd_array
+
+    def get_bd_for_flat_gains(self, row:int, target_gains:float, max_bd:int, progress_mult:float, power_mult:float) -> Optional[np.ndarray]:
+        '''
+        Finds the smallest BD distribution up to a row where every row has at least the target gains/tick.
+        Starts at the top row, and walks down, so each row knows how much the row above it consumes
+        Params:
+            -----
+            row: last row of the distribution, 1 indexed
+            target_gains: gains/tick every row should reach
+            max_bd: most BD that can be spent in total
+        Returns:
+            ----
+            bd_array: bd for rows 1 to row, or None if max_bd isn't enough to reach the target
+        '''
+        bd_array = np.zeros(row, dtype=int)
+        consume = 0
+        remaining_bd = max_bd
+        for i in range(row, 0, -1):
+            required_bd = self.synergy_rows[i].calculate_bd_for_gains(target_gains + consume, remaining_bd, progress_mult, power_mult)
+            if required_bd is None:
+                return None
+            bd_array[i-1] = required_bd
+            remaining_bd -= required_bd
+            _, consume, _, _ = self.synergy_rows[i].calculate_gains_per_tick(required_bd, progress_mult, power_mult)
+        return bd_array
+
+    def simulate_horizon(self, baby_demon_array:List[int], ticks:np.ndarray, progress_mult:float, power_mult:float,
+                         level_ups:bool = True) -> HorizonTrajectory:
+        '''
+        Projects the points, bonus and level of every row of this page over time, with a fixed BD distribution.
+        Rows past the end of the distribution get no BD. Each row's fills come from its closed form FillSchedule, so the
+        cost doesn't depend on how long the horizon is. Every bar is assumed to start empty.
+        A row can only fill while the row before it has the 2x level points it takes, otherwise its full bar waits
+        until it does, so it can't fill faster than the row before it gains points, and points never go negative.
+        The waiting is found on a grid of HORIZON_GRID_SIZE times over the horizon (plus the sample times), so a row
+        that runs dry between grid times can fill a bit early, by at most one grid step.
+        With level ups on, the points from a fill use level * power_mult instead of rounding it every fill, so
+        the points can be off by up to half a point per fill
+        Params:
+            -----
+            baby_demon_array: list of baby demons to apply to each row of synergy
+            ticks: times to sample the trajectories at, in ticks
+            progress_mult: progress mutliplier
+            power_mult: power multiplier
+            level_ups: whether or not every fill raises the row's level by 1
+        '''
+        ticks = np.asarray(ticks, dtype=float)
+        grid = np.union1d(ticks, np.linspace(0, ticks.max(initial=0), HORIZON_GRID_SIZE))
+        samples = np.searchsorted(grid, ticks)
+        current_points = self.get_all_points()
+        fills = np.zeros((7, len(grid)))
+        level_sums = np.zeros((7, len(grid)))
+        levels = np.zeros((7, len(grid)))
+        gains = np.zeros((7, len(grid)))
+        syn_energy = np.zeros(len(grid))
+        supply = None #points the row before has had so far, None for row 1 since nothing comes before it
+        for i in range(7):
+            synergy_row = self.synergy_rows[i+1]
+            number_bd = baby_demon_array[i] if i < len(baby_demon_array) else 0
+            schedule = synergy_row.get_fill_schedule(number_bd, progress_mult, level_ups)
+            if supply is None:
+                fills[i] = schedule.fills_at(grid)
+            else:
+                #each fill takes 2x its level from the row before it, so this is how many fills it can afford so far.
+                #Once its bar is full for the next one, it waits, which puts it behind its own schedule from then on
+                affordable = schedule.fills_for_level_sum(supply / 2)
+                next_full = schedule.ticks_for(affordable + 1)
+                waited = np.maximum.accumulate(np.maximum(grid - next_full, 0))
+                fills[i] = np.minimum(schedule.fills_at(grid - waited), affordable)
+            level_sums[i] = schedule.level_sum(fills[i])
+            levels[i] = synergy_row.level + schedule.level_step * fills[i]
+            if level_ups:
+                gains[i] = level_sums[i] * power_mult
+            else:
+                gains[i] = fills[i] * round(synergy_row.level * power_mult)
+            syn_energy += fills[i] * synergy_row.synergy_energy_per_fill
+            supply = current_points[i] + gains[i]
+
+        #each row takes 2x its level from the row before it every fill
+        points = np.array(current_points, dtype=float)[:, None] + gains
+        points[:-1] -= 2 * level_sums[1:]
+        points, levels, fills, syn_energy = points[:, samples], levels[:, samples], fills[:, samples], syn_energy[samples]
+        divisors = np.array([[self.synergy_rows[i+1].divisor] for i in range(7)])
+        log_scalings = np.array([[self.synergy_rows[i+1].log_scaling] for i in range(7)])
+        bonus = calculate_bonus_array(points, divisors, log_scalings)
+        return HorizonTrajectory(ticks, points, bonus, levels, fills, syn_energy)
+
+    def get_energy_efficiency_order(self) -> np.ndarray:
+        '''
+        Returns the order of energy efficiency for the rows of this page.
+        As a note, this is 0 indexed and needs to be corrected later
+        '''
+        ordering_dict = {i:self.synergy_rows[i+1].get_energy_efficiency() for i in range(7)}
+        ordered_dict = {k:v for k, v in sorted(ordering_dict.items(), key= lambda item:item[1], reverse=True)}
+        return ordered_dict
+
+
+    def get_all_levels(self):
+        return [x.level for _, x in self.synergy_rows.items()]
+    def get_all_points(self):
+        return [x.current_points for _, x in self.synergy_rows.items()]
\ No newline at end of file
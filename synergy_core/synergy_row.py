@@ -0,0 +1,362 @@
+import math
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from synergy_core.row_evaluation_cache import RowEvaluationCache
+from synergy_core.horizon import FillSchedule
+
+class TickLadder(NamedTuple):
+    '''
+    Speed cap tiers of a single row, for one level and progress multiplier.
+    Each entry is one tier, sorted from the fewest BD (10 ticks to fill) to the most BD (1 tick, min tick)
+    '''
+    ticks: np.ndarray #ticks it takes to fill the bar in this tier
+    min_bd: np.ndarray #smallest number of BD that reaches this tier
+    gains_per_tick: np.ndarray #points gained per tick in this tier
+    consume_per_tick: np.ndarray #points consumed from the row before per tick in this tier
+    energy_per_tick: np.ndarray #synergy energy gained per tick in this tier, before the energy multiplier
+
+class SynergyRow:
+    '''
+    Class to represent a single row of synergy. This is to simplify getting logic for getting progress, 
+    and doing various things.
+    This has no Qt dependency. Changes are reported to any callbacks added with add_listener, which are called
+    with the event name ("level_changed", "points_changed" or "bonus_changed") and the page, row and new value.
+    Between begin_batch and end_batch, changes are held back and reported once at the end
+    '''
+    __slots__ = ("level", "page", "row", "row_cache", "base_progress", "divisor", "log_scaling", "current_progress",
+                 "_tick_ladder", "_tick_ladder_progress", "_tick_ladder_power", "synergy_energy_per_fill",
+                 "current_points", "current_bonus", "listeners", "pending_events", "batch_start_values")
+    
+    base_progress_dict = {
+        1: np.array([10000, 20000, 35000, 55000, 80000, 110000, 150000]),
+        2: np.array([20000, 40000, 70000, 110000, 160000, 220000, 300000]),
+        3: np.array([50000, 100000, 175000, 280000, 400000, 550000, 750000])
+    } #dict to hold the base progress values for each page/row
+
+    bonus_divisors_dict = {
+        1:[1,1,1,1,1,2,2],
+        2: [1,1,1,2,2,2,2],
+        3: [1,2,2,2,2,4,4]
+    } #divisors for each page and row of synergy. All rows of synergy have very similar 
+    #formulas to calculate the bonus, with these divisors applied after the fact to let
+    #the later pages/rows scale worse
+
+    log_scaling_array = [6, 5.6, 5.2, 4.8, 4.4, 4, 3.5] #log scaling for each row of synergy
+    #the higher the log scaling, the more you need to increase your points to double a bonus
+
+    def __init__(self, page:int, row: int, current_level:int, current_points:float, row_cache:Optional[RowEvaluationCache] = None):
+        self.listeners:List[Callable] = []
+        self.pending_events:Optional[Dict[str, float]] = None #changes held back during a batch, see begin_batch
+        self.batch_start_values:Dict[str, float] = {}
+        self.level = current_level
+        self.page = page
+        self.row = row
+        self.row_cache = row_cache #optional cache shared by all rows, see calculate_gains_per_tick
+
+        self.base_progress = self.base_progress_dict[page][row-1]
+        self.divisor = self.bonus_divisors_dict[page][row-1]
+        self.log_scaling = self.log_scaling_array[row-1]
+        self.current_progress = 0
+
+        #tick ladder cache, see get_tick_ladder
+        self._tick_ladder:Optional[TickLadder] = None
+        self._tick_ladder_progress:Optional[float] = None
+        self._tick_ladder_power:Optional[float] = None
+
+        self.synergy_energy_per_fill = np.sum(range(1,row+1))
+
+        self.current_points = current_points
+        self.current_bonus = self.calculate_bonus(self.current_points)
+
+        self.update_current_progress()
+
+    def update_current_progress(self):
+        '''
+        Actually synergy progress requirement has a minimum value of 1/10 of the base progress
+        Otherwise, the current progress requirement is reduced by 10 for every level
+        '''
+        self.current_progress = max(self.base_progress/10, self.base_progress-(self.level-1)*10)
+                                    
+    def add_listener(self, callback:Callable):
+        self.listeners.append(callback)
+
+    def notify(self, event:str, value:float):
+        if self.pending_events is not None:
+            self.pending_events[event] = value
+            return
+        for callback in self.listeners:
+            callback(event, self.page, self.row, value)
+
+    def begin_batch(self):
+        '''
+        Holds back change notifications until end_batch
+        '''
+        if self.pending_events is None:
+            self.pending_events = {}
+            self.batch_start_values = {"level_changed": self.level, "points_changed": self.current_points,
+                                       "bonus_changed": self.current_bonus}
+
+    def end_batch(self):
+        '''
+        Reports each change held back since begin_batch once, with its final value.
+        Anything that ended up back at its value from the start of the batch isn't reported
+        '''
+        pending_events = self.pending_events
+        self.pending_events = None
+        if pending_events is None:
+            return
+        for event, value in pending_events.items():
+            if value != self.batch_start_values.get(event):
+                self.notify(event, value)
+
+    def set_level(self, level:int):
+        self.level = level
+        self.notify("level_changed", self.level)
+        self.update_current_progress()
+        self.invalidate_tick_ladder()
+        if self.row_cache is not None:
+            self.row_cache.invalidate_row(self.page, self.row)
+
+    def invalidate_tick_ladder(self):
+        '''
+        Drops the cached tick ladder, so it gets rebuilt the next time it is needed
+        '''
+        self._tick_ladder = None
+        self._tick_ladder_progress = None
+        self._tick_ladder_power = None
+
+    def get_tick_ladder(self, progress_mult:float, power_mult:float) -> TickLadder:
+        '''
+        Returns the speed cap tiers of this row (see TickLadder).
+        This is built lazily, and kept until the level or progress multiplier changes.
+        Only the gains depend on the power multiplier, so those are just redone if power is different
+        '''
+        if self._tick_ladder is None or self._tick_ladder_progress != progress_mult:
+            ticks_list = []
+            min_bd_list = []
+            for ticks in range(10, 0, -1):
+                required_bd = math.ceil((self.current_progress/progress_mult)/ticks)
+                #the real number of ticks can be lower than the tier we asked for if the ceil landed on a faster tier
+                actual_ticks = math.ceil(self.current_progress/(required_bd*progress_mult))
+                if len(min_bd_list) > 0 and required_bd == min_bd_list[-1]:
+                    ticks_list[-1] = actual_ticks
+                else:
+                    ticks_list.append(actual_ticks)
+                    min_bd_list.append(required_bd)
+            ticks = np.array(ticks_list, dtype=int)
+            self._tick_ladder = TickLadder(ticks, np.array(min_bd_list, dtype=int), np.zeros(len(ticks)),
+                                           self.level * 2 / ticks, self.synergy_energy_per_fill / ticks)
+            self._tick_ladder_progress = progress_mult
+            self._tick_ladder_power = None
+        if self._tick_ladder_power != power_mult:
+            self._tick_ladder = self._tick_ladder._replace(gains_per_tick=round(self.level * power_mult) / self._tick_ladder.ticks)
+            self._tick_ladder_power = power_mult
+        return self._tick_ladder
+
+    def lookup_tick_tier(self, number_bd:int, progress_mult:float, power_mult:float) -> int:
+        '''
+        Returns the index into the tick ladder of the tier this many BD reach, or -1 if they aren't speed capped.
+        This is a binary search, so it is O(log(tiers))
+        '''
+        ladder = self.get_tick_ladder(progress_mult, power_mult)
+        return int(np.searchsorted(ladder.min_bd, number_bd, side="right")) - 1
+
+    def calculate_gains_per_tick(self, number_bd:int, progress_mult:float, power_mult:float):
+        '''
+        calculates the results of a certain number of baby demons being applied to this row of synergy.
+        As a note, each row of synergy will consume 2x its level every time it finishes from the row before
+        Returns:
+            ----
+            gains_per_tick: how much synergy points will result from a single tick with this number of bds
+            consume_per_tick: how much synergy points will be consumed from the previous row with this nuymber of bds
+            speed_capped: bool showing if this is speed capped
+            speed_capped_removal: if speed capped is true, this is how many BD we are overcapping by
+        '''
+        if self.row_cache is None:
+            return self.evaluate_gains_per_tick(number_bd, progress_mult, power_mult)
+        key = (self.page, self.row, self.level, number_bd, progress_mult, power_mult)
+        result = self.row_cache.get(key)
+        if result is None:
+            result = self.evaluate_gains_per_tick(number_bd, progress_mult, power_mult)
+            self.row_cache.put(key, result)
+        return result
+
+    def evaluate_gains_per_tick(self, number_bd:int, progress_mult:float, power_mult:float):
+        '''
+        Does the actual math for calculate_gains_per_tick, without going through the row cache
+        '''
+        points_per_tick = number_bd * progress_mult
+        if points_per_tick > self.current_progress / 10:
+            #if the points per tick is more than 1/10th of the requirement, we do a min tick calculation
+            ticks_to_fill = math.ceil(self.current_progress/points_per_tick) #gets how maany ticks it's currently taking to fill the bar
+            #calculates the actual gains we're getting
+            gains_per_tick = round(self.level * power_mult) /ticks_to_fill
+            consume_per_tick = self.level * 2 / ticks_to_fill
+
+            #calculate the required BD to get the actual number of ticks we want as 
+            #the "effective" progress requirement (current progress divided by progress multi), divided 
+            #by the number of ticks we're taking. This is ceiling'd
+            required_bd = math.ceil((self.current_progress/progress_mult)/ticks_to_fill)
+            overcapped_bd = number_bd - required_bd
+            return gains_per_tick, consume_per_tick, True, overcapped_bd
+        else:
+            #otherwise, we dont care about the speed capping impacts
+            gains_per_tick = points_per_tick * round(self.level * power_mult) / self.current_progress
+            consume_per_tick = points_per_tick * self.level * 2 / self.current_progress
+            return gains_per_tick, consume_per_tick, False, 0
+        
+    def calculate_bd_for_min_tick(self, number_bd:int, progress_mult:float) -> int:
+        '''
+        Helper function to calculate how many BD are needed to not overcap this row of synergy
+        '''
+        tier = self.lookup_tick_tier(number_bd, progress_mult, 1)
+        if tier >= 0:
+            return int(self.get_tick_ladder(progress_mult, 1).min_bd[tier])
+        #not speed capped, so this takes more than 10 ticks to fill
+        points_per_tick = number_bd * progress_mult
+        ticks_to_fill = math.ceil(self.current_progress/points_per_tick) #gets how maany ticks it's currently taking to fill the bar
+        required_bd = math.ceil((self.current_progress/progress_mult)/ticks_to_fill)
+        return required_bd
+
+    def calculate_bd_for_gains(self, required_gains:float, max_bd:int, progress_mult:float, power_mult:float) -> Optional[int]:
+        '''
+        Finds the smallest number of BD that gives at least the required gains/tick on this row.
+        Gains/tick never go down when adding BD, so this is just a bisection over [0, max_bd]
+        Returns:
+            ----
+            required_bd: smallest number of bd that reaches the required gains, or None if max_bd isn't enough
+        '''
+        if required_gains <= 0:
+            return 0
+        if self.calculate_gains_per_tick(max_bd, progress_mult, power_mult)[0] < required_gains:
+            return None
+        low, high = 0, max_bd #low is always too few BD, high is always enough
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self.calculate_gains_per_tick(mid, progress_mult, power_mult)[0] >= required_gains:
+                high = mid
+            else:
+                low = mid
+        return high
+
+    def calculate_tier_thresholds(self, progress_mult:float) -> np.ndarray:
+        '''
+        Once a row is speed capped, it can only take between 1 and 10 ticks to fill, and the gains step between these tiers.
+        This returns the smallest number of BD that reaches each tier, starting from the 1 tick (min tick) tier.
+        Tiers that need the same number of BD as a faster tier are dropped
+        '''
+        return self.get_tick_ladder(progress_mult, 1).min_bd[::-1]
+
+    def calculate_bd_for_gains_from_tiers(self, required_gains:float, max_bd:int, progress_mult:float, power_mult:float) -> Optional[int]:
+        '''
+        Same as calculate_bd_for_gains, but checks only the few BD values where the answer can be.
+        Below the speed cap, gains are linear in BD, so the answer there is a single division.
+        Above it, gains only change when a new tier is reached, so the answer is the cheapest tier in the tick ladder
+        that has enough gains.
+        Returns:
+            ----
+            required_bd: smallest number of bd that reaches the required gains, or None if max_bd isn't enough
+        '''
+        if required_gains <= 0:
+            return 0
+        points_per_fill = round(self.level * power_mult)
+        if points_per_fill <= 0:
+            return None
+        candidates = []
+        linear_bd = math.ceil(required_gains * self.current_progress / (progress_mult * points_per_fill))
+        if linear_bd * progress_mult <= self.current_progress / 10:
+            #guards against the division landing one off due to float rounding
+            while linear_bd > 1 and self.calculate_gains_per_tick(linear_bd - 1, progress_mult, power_mult)[0] >= required_gains:
+                linear_bd -= 1
+            candidates.append(linear_bd)
+            candidates.append(linear_bd + 1)
+        ladder = self.get_tick_ladder(progress_mult, power_mult)
+        tier = int(np.searchsorted(ladder.gains_per_tick, required_gains, side="left"))
+        if tier < len(ladder.min_bd):
+            candidates.append(int(ladder.min_bd[tier]))
+        for bd in sorted(candidates):
+            if bd > max_bd:
+                return None
+            if self.calculate_gains_per_tick(bd, progress_mult, power_mult)[0] >= required_gains:
+                return bd
+        return None
+
+
+
+    def calculate_bonus(self, points:float):
+        '''
+        Calculates the bonus that would give applied from this row of synergy based off of 
+        an input number of points.
+        Below 1000, this scales linearly with points. I.e., if there is a divisor of 1,
+        then a points of 100 would give 100/1000 or .1 (10%) bonus, 500 would give 50%, etc.
+        Above 1000 points, the scaling is determined mostly by the log scaling.
+        Earlier rows scale more "harshly", i.e. with a log scaling of 6.5, a row needs 6.5x points
+        to double its bonus.
+        A log scaling of 5 requires 5x the points to 2x the bonus, etc
+
+        This returns the multiplicative bonus, i.e. if the game would display 50%, this returns 1.5.
+        If the game would display 100%, this displays 2, etc
+        '''
+        if points <=1000:
+                return points/1000/self.divisor + 1
+        else:
+            return (2**(math.log(points/1000, self.log_scaling)))/self.divisor + 1
+        
+    def calculate_points_for_bonus(self, bonus:float) -> float:
+        '''
+        Inverse of calculate_bonus, returns the points needed for a multiplicative bonus
+        '''
+        scaled_bonus = (bonus - 1) * self.divisor
+        if scaled_bonus <= 1:
+            return scaled_bonus * 1000
+        return 1000 * self.log_scaling**math.log2(scaled_bonus)
+
+    def set_current_points(self, points:float):
+        self.current_points = points
+        self.current_bonus = self.calculate_bonus(self.current_points)
+        self.notify("points_changed", self.current_points)
+        self.notify("bonus_changed", self.current_bonus)
+
+    def calculate_syn_energy_per_tick(self, number_bd:int, progress_mult:float):
+        '''
+        calculates the results of a certain number of baby demons being applied to this row of synergy,
+        returning the synergy energy gained per tick.
+        Returns:
+            ----
+            gains_per_tick: how much synergy energy will result from a single tick with this number of bds
+            speed_capped: bool showing if this is speed capped
+            speed_capped_removal: if speed capped is true, this is how many BD we are overcapping by
+        '''
+        points_per_tick = number_bd * progress_mult
+        ticks_to_fill = math.ceil(self.current_progress/points_per_tick) #gets how maany ticks it's currently taking to fill the bar
+        if points_per_tick > self.current_progress / 10:
+            #if the points per tick is more than 1/10th of the requirement, we do a min tick calculation
+            ticks_to_fill = math.ceil(self.current_progress/points_per_tick) #gets how maany ticks it's currently taking to fill the bar
+            #calculates the actual gains we're getting
+            gains_per_tick = self.synergy_energy_per_fill/ticks_to_fill
+
+            #calculate the required BD to get the actual number of ticks we want as 
+            #the "effective" progress requirement (current progress divided by progress multi), divided 
+            #by the number of ticks we're taking. This is ceiling'd
+            required_bd = math.ceil((self.current_progress/progress_mult)/ticks_to_fill)
+            overcapped_bd = number_bd - required_bd
+            return gains_per_tick, True, overcapped_bd
+        else:
+            #otherwise, we dont care about the speed capping impacts
+            gains_per_tick = points_per_tick * self.synergy_energy_per_fill / self.current_progress
+            return gains_per_tick, False, 0
+        
+    def get_fill_schedule(self, number_bd:int, progress_mult:float, level_ups:bool = True) -> FillSchedule:
+        '''
+        Returns the schedule of when this row fills with a fixed number of BD, starting from an empty bar at the
+        current level. See FillSchedule
+        '''
+        return FillSchedule(self.level, self.current_progress, self.base_progress/10, number_bd * progress_mult, level_ups)
+
+    def get_energy_efficiency(self):
+        '''
+        Returns the energy efficiency of this row. This im defining as energy/current progress required
+        '''
+        return self.synergy_energy_per_fill/self.current_progress
\ No newline at end of file
@@ -0,0 +1,131 @@
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+#inputs that change the multipliers, named as in the saved json file's inputs dict, with their defaults
+MULTIPLIER_INPUTS = {
+    "Active Syn Pot": False,
+    "Newb Progress Trophy": False,
+    "Pro Progress Trophy": False,
+    "Newb Power Trophy": False,
+    "Pro Power Trophy": False,
+    "Soul Power Purchase": False,
+    "Adventure Power %": 0,
+    "Syn Power Perks Level": 0,
+    "Max Stage": 415,
+    "Pomos Power Levels": 0,
+    "Adventure Energy %": 0,
+    "Newb Energy Trophy": False,
+    "Pro Energy Trophy": False,
+}
+
+
+class WhatIfResult(NamedTuple):
+    '''
+    One set of inputs of a what-if grid, see SynergyModel.what_if_grid
+    '''
+    changes: Dict[str, float] #inputs that are different from the current ones, with their values
+    synergy_progress: float
+    synergy_power: float
+    synergy_energy: float
+    bd_array: np.ndarray #optimized bd distribution with these inputs
+    gains_array: np.ndarray #gains/tick of every row
+    syn_energy: float #synergy energy gained per tick
+    score: float #value of the page objective, see SynergyModel.score_objective
+    gain: float #score relative to the score with the current inputs
+
+
+# All of these work on plain values or on numpy arrays of them, which broadcast against each other.
+# float_power is used since it matches math.pow exactly, and np.power can be off in the last bit
+
+def calculate_potion_bonus(max_stage):
+    '''
+    Gets the increase to potion effectiveness based off of max stage.
+    For every 100 stages exactly above 400, potion effectiveness exponentially increases by 20% each time
+    '''
+    return .5 * np.float_power(1.2, np.floor((np.asarray(max_stage) - 400)/100)) + 1
+
+def calculate_progress_multiplier(inputs:dict):
+    '''
+    Synergy progress multiplier from the inputs dict, see SynergyModel.calculate_synergy_progress
+    '''
+    progress = 1
+    #trophies calculation
+    #newb is .05, pro is .1
+    progress = progress* (1 + np.multiply(inputs["Newb Progress Trophy"], .05) + np.multiply(inputs["Pro Progress Trophy"], .1))
+    #potion calculation
+    progress = progress * (1 + np.multiply(inputs["Active Syn Pot"], calculate_potion_bonus(inputs["Max Stage"]) - 1))
+    return progress
+
+def calculate_power_multiplier(inputs:dict):
+    '''
+    Synergy power multiplier from the inputs dict, see SynergyModel.calculate_synergy_power
+    '''
+    power = 1
+    #potion calculation, base effectiveness of 50%
+    power = power * (1 + np.multiply(inputs["Active Syn Pot"], calculate_potion_bonus(inputs["Max Stage"]) - 1))
+    #trophies
+    power = power* (1 + np.multiply(inputs["Newb Power Trophy"], .1) + np.multiply(inputs["Pro Power Trophy"], .2))
+    #soul purchase, .25001 due to rounding things
+    power = power * (1 + np.multiply(inputs["Soul Power Purchase"], .25001))
+    #adventure items, need to convert from %
+    power = power  * (1 + np.asarray(inputs["Adventure Power %"])/100)
+    #perks
+    #starts off giving 1%, and grows linearly
+    perk_level = np.asarray(inputs["Syn Power Perks Level"])
+    power = power * (1 + perk_level * (perk_level + 1)/2/100)
+    #syn v2
+    power = power * np.float_power(1.005, inputs["Pomos Power Levels"])
+    return power
+
+def calculate_energy_multiplier(inputs:dict):
+    '''
+    Synergy energy multiplier from the inputs dict, see SynergyModel.calculate_synergy_energy
+    '''
+    energy = 1
+    #adventure items, need to convert from %
+    energy = energy  * (1 + np.asarray(inputs["Adventure Energy %"])/100)
+    #trophies, they are multiplicative with each other
+    energy = energy* (1 + np.multiply(inputs["Newb Energy Trophy"], .3))
+    energy = energy* (1 + np.multiply(inputs["Pro Energy Trophy"], .7))
+    return energy
+
+
+def get_input_grid(base_inputs:dict, grid:Dict[str, Sequence]) -> Tuple[Dict[str, np.ndarray], int]:
+    '''
+    Returns the Cartesian product of the values of each grid input, as one flat array per input, with every input
+    that isn't on the grid kept at its value in base_inputs. Also returns the number of points on the grid
+    '''
+    unknown = set(grid) - set(MULTIPLIER_INPUTS)
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown inputs {sorted(unknown)}")
+    names = list(grid)
+    axes = np.meshgrid(*(np.asarray(grid[name]) for name in names), indexing="ij")
+    size = int(np.prod([len(grid[name]) for name in names]))
+    inputs = {name: np.full(size, base_inputs.get(name, default)) for name, default in MULTIPLIER_INPUTS.items()}
+    for name, axis in zip(names, axes):
+        inputs[name] = axis.ravel()
+    return inputs, size
+
+
+def get_upgrade_grid(base_inputs:dict, steps:int = 1) -> Dict[str, Sequence]:
+    '''
+    Returns a grid of every upgrade from base_inputs: each trophy, the soul purchase and the potion either as they are
+    or bought, and the perk level, pomos levels and max stage from where they are up to steps upgrades (of 1 level,
+    1 level and 100 stages) higher. The adventure items are left out, since they aren't upgraded in steps
+    '''
+    grid = {}
+    for name in ("Active Syn Pot", "Newb Progress Trophy", "Pro Progress Trophy", "Newb Power Trophy", "Pro Power Trophy",
+                 "Soul Power Purchase", "Newb Energy Trophy", "Pro Energy Trophy"):
+        grid[name] = [True] if base_inputs.get(name, False) else [False, True]
+    for name, step in (("Syn Power Perks Level", 1), ("Pomos Power Levels", 1), ("Max Stage", 100)):
+        value = base_inputs.get(name, MULTIPLIER_INPUTS[name])
+        grid[name] = [value + step * i for i in range(steps + 1)]
+    return grid
+
+
+def rank_results(results:List[WhatIfResult]) -> List[WhatIfResult]:
+    '''
+    Sorts results from the biggest gain to the smallest. Ties go to the one that changes the fewest inputs
+    '''
+    return sorted(results, key=lambda result: (-result.score, len(result.changes)))
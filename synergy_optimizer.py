@@ -7,15 +7,7 @@ from PySide6.QtWidgets import QApplication
 
 synergy_input  = Backend.load_json_file()
 if synergy_input is not None:
-    level_1 = synergy_input["page 1 levels"] 
-    level_2 = synergy_input["page 2 levels"] 
-    level_3 = synergy_input["page 3 levels"]  
-    point_1 = synergy_input["page 1 points"]  
-    point_2 = synergy_input["page 2 points"] 
-    point_3 = synergy_input["page 3 points"]
-    bd = synergy_input["total bd"] 
-    inputs = synergy_input["inputs dict"] 
-    backend = Backend(level_1, level_2, level_3, point_1, point_2, point_3, bd, inputs)
+    backend = Backend.from_state_dict(synergy_input)
 else:
     inputs_dict = {
         
@@ -0,0 +1,91 @@
+import numpy as np
+
+from synergy_core import SynergyModel
+from synergy_core import synergy_model
+
+
+def get_states(seed:int, count:int = 30):
+    '''
+    Random models with few enough BD to try every distribution, and levels from brand new to late game
+    '''
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        levels = [int(level) for level in rng.integers(1, int(10**rng.uniform(0.5, 5)), 7)]
+        inputs = {"Active Syn Pot": bool(rng.integers(2)), "Syn Power Perks Level": int(rng.integers(20)),
+                  "Max Stage": int(rng.integers(100, 5000))}
+        model = SynergyModel(levels, levels, levels, [0]*7, [0]*7, [0]*7, int(rng.integers(5, 30)), inputs)
+        model.verbose = False
+        yield model
+
+
+def get_row_tables(model:SynergyModel, page:int):
+    '''
+    Energy/tick, gains/tick and consumption/tick of every row for every number of BD up to total_bd
+    '''
+    tables = []
+    for i in range(1, 8):
+        row = model.synergy_pages[page].synergy_rows[i]
+        energy, gains, consume = [0.0], [0.0], [0.0]
+        for number_bd in range(1, model.total_bd + 1):
+            energy.append(row.calculate_syn_energy_per_tick(number_bd, model.synergy_progress)[0])
+            row_gains, row_consume, _, _ = row.calculate_gains_per_tick(number_bd, model.synergy_progress, model.synergy_power)
+            gains.append(row_gains)
+            consume.append(row_consume)
+        tables.append((energy, gains, consume))
+    return tables
+
+
+def brute_force_energy(model:SynergyModel, page:int) -> float:
+    #best energy for each number of BD used, adding one row at a time
+    best = {0: 0.0}
+    for energy, _, _ in get_row_tables(model, page):
+        new_best = {}
+        for used, value in best.items():
+            for number_bd in range(model.total_bd - used + 1):
+                new_best[used + number_bd] = max(new_best.get(used + number_bd, -np.inf), value + energy[number_bd])
+        best = new_best
+    return max(best.values())
+
+
+def brute_force_energy_non_negative(model:SynergyModel, page:int) -> float:
+    #best energy for each number of BD used and BD on the row just added, from row 7 down
+    tables = get_row_tables(model, page)
+    best = {(number_bd, number_bd): tables[6][0][number_bd] for number_bd in range(model.total_bd + 1)}
+    for i in range(5, -1, -1):
+        energy, gains, _ = tables[i]
+        consume_above = tables[i+1][2]
+        new_best = {}
+        for (used, above_bd), value in best.items():
+            for number_bd in range(model.total_bd - used + 1):
+                if gains[number_bd] - consume_above[above_bd] >= 0:
+                    key = (used + number_bd, number_bd)
+                    new_best[key] = max(new_best.get(key, -np.inf), value + energy[number_bd])
+        best = new_best
+    return max(best.values())
+
+
+def test_exact_matches_brute_force():
+    for model in get_states(0):
+        bd_array, _, syn_energy = model.maximize_energy_on_page(1)
+        assert np.sum(bd_array) <= model.total_bd
+        expected = brute_force_energy(model, 1) * model.synergy_energy
+        assert abs(syn_energy - expected) <= 1e-9 * expected
+
+
+def test_non_negative_matches_brute_force():
+    for model in get_states(1):
+        bd_array, gains_array, syn_energy = model.maximize_energy_on_page(1, non_negative=True)
+        assert np.sum(bd_array) <= model.total_bd
+        assert np.all(gains_array >= 0)
+        expected = brute_force_energy_non_negative(model, 1) * model.synergy_energy
+        assert abs(syn_energy - expected) <= 1e-9 * expected
+
+
+def test_non_negative_heuristic_is_valid(monkeypatch):
+    #past NON_NEGATIVE_TABLE_MAX_BD it's a heuristic, so it can only be checked against the exact answer
+    monkeypatch.setattr(synergy_model, "NON_NEGATIVE_TABLE_MAX_BD", 0)
+    for model in get_states(2):
+        bd_array, gains_array, syn_energy = model.maximize_energy_on_page(1, non_negative=True)
+        assert np.sum(bd_array) <= model.total_bd
+        assert np.all(gains_array >= 0)
+        assert syn_energy <= brute_force_energy_non_negative(model, 1) * model.synergy_energy * (1 + 1e-9)
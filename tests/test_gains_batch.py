@@ -0,0 +1,42 @@
+import numpy as np
+
+from synergy_core import SynergyModel
+
+
+def test_batch_gains_match_single_evaluations():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        levels = [int(level) for level in rng.integers(1, 100000, 7)]
+        model = SynergyModel(levels, levels, levels, [0]*7, [0]*7, [0]*7, 0, {"Active Syn Pot": bool(rng.integers(2)),
+                                                                              "Syn Power Perks Level": int(rng.integers(10))})
+        for page in range(1, 4):
+            synergy_page = model.synergy_pages[page]
+            number_rows = int(rng.integers(1, 8))
+            bd_matrix = rng.integers(0, 10**int(rng.integers(1, 9)), (25, number_rows))
+            bd_matrix[0] = 0
+            gains, consume, speed_capped, overcapped = synergy_page.get_all_gains_per_tick_batch(
+                bd_matrix, model.synergy_progress, model.synergy_power)
+            for i, bd_array in enumerate(bd_matrix):
+                single_gains, single_capped, single_overcapped = synergy_page.get_all_gains_per_tick(
+                    list(bd_array), model.synergy_progress, model.synergy_power)
+                assert np.allclose(gains[i], single_gains, rtol=1e-12, atol=0)
+                assert list(speed_capped[i]) == list(single_capped)
+                assert np.array_equal(overcapped[i], single_overcapped)
+                for row in range(number_rows):
+                    row_consume = synergy_page.synergy_rows[row+1].calculate_gains_per_tick(
+                        int(bd_array[row]), model.synergy_progress, model.synergy_power)[1]
+                    assert np.isclose(consume[i, row], row_consume, rtol=1e-12, atol=0)
+
+
+def test_batch_gains_take_one_multiplier_per_candidate():
+    levels = [3000, 2500, 2000, 1500, 1000, 800, 500]
+    model = SynergyModel(levels, levels, levels, [0]*7, [0]*7, [0]*7, 0, {})
+    synergy_page = model.synergy_pages[1]
+    rng = np.random.default_rng(2)
+    bd_matrix = rng.integers(0, 5000, (30, 7))
+    progress = rng.uniform(1, 3, 30)
+    power = rng.uniform(1, 10, 30)
+    gains, _, _, _ = synergy_page.get_all_gains_per_tick_batch(bd_matrix, progress, power)
+    for i in range(30):
+        single_gains, _, _ = synergy_page.get_all_gains_per_tick(list(bd_matrix[i]), progress[i], power[i])
+        assert np.allclose(gains[i], single_gains, rtol=1e-12, atol=0)
@@ -0,0 +1,77 @@
+import numpy as np
+
+from synergy_core import PageObjective, SynergyModel
+
+LEVELS = [3000, 2500, 2000, 1500, 1000, 800, 500]
+
+
+def build_model(levels, points, total_bd:int) -> SynergyModel:
+    model = SynergyModel(levels, levels, levels, points, points, points, total_bd, {})
+    model.verbose = False
+    return model
+
+
+def test_optimized_projection_never_goes_negative():
+    #maximize_one_row keeps the lower rows barely non-negative at the current levels, so they run dry as row 7 levels up
+    model = build_model(LEVELS, [0]*7, 20000)
+    for page in range(1, 4):
+        bd_array, _, _ = model.maximize_one_row(page, 7)
+        trajectory = model.simulate_horizon(page, bd_array, 24)
+        assert np.all(trajectory.points >= 0)
+        assert np.all(np.diff(trajectory.fills, axis=1) >= 0)
+
+
+def test_random_projections_never_go_negative():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        levels = [int(level) for level in rng.integers(1, 5000, 7)]
+        points = [float(points) for points in rng.integers(0, 100000, 7)]
+        model = build_model(levels, points, 20000)
+        bd_array = [int(bd) for bd in rng.integers(0, 5000, 7)]
+        for level_ups in (True, False):
+            trajectory = model.simulate_horizon(1, bd_array, float(rng.uniform(0.1, 100)), samples=11, level_ups=level_ups)
+            assert np.all(trajectory.points >= 0)
+
+
+def test_projection_without_starving_rows_is_unchanged():
+    #with BD only on row 1 nothing is held up, so it fills on its own schedule
+    model = build_model(LEVELS, [0]*7, 20000)
+    ticks = np.linspace(0, 36000 * 24, 11)
+    trajectory = model.synergy_pages[1].simulate_horizon([20000], ticks, model.synergy_progress, model.synergy_power)
+    schedule = model.synergy_pages[1].synergy_rows[1].get_fill_schedule(20000, model.synergy_progress)
+    assert np.array_equal(trajectory.fills[0], schedule.fills_at(ticks))
+
+
+def test_reassignment_plans_are_feasible():
+    model = build_model(LEVELS, [0]*7, 20000)
+    for page in (1, 2):
+        for method in ("maximize_one_row", "flat_up_to_row", "maximize_energy_on_page"):
+            plan = model.plan_reassignments(PageObjective(page, method, 7), 24, 4)
+            assert plan.feasible
+            assert np.all(plan.trajectory.points >= 0)
+            assert plan.value >= plan.static_value
+
+
+def test_reassignment_plan_without_feasible_candidates(monkeypatch):
+    #nothing is feasible, so the plan keeps the first static optimum and says it isn't feasible
+    monkeypatch.setattr(SynergyModel, "is_feasible", staticmethod(lambda trajectory, start_points: False))
+    model = build_model(LEVELS, [0]*7, 20000)
+    plan = model.plan_reassignments(PageObjective(1, "maximize_one_row", 7), 24, 4)
+    assert not plan.feasible
+    assert len(plan.steps) == 1
+    assert np.array_equal(plan.steps[0].bd_array, model.maximize_one_row(1, 7)[0])
+    assert plan.value == plan.static_value
+
+
+def test_min_bd_for_bonus_already_reached():
+    points = [5000.0]*7
+    model = build_model(LEVELS, points, 20000)
+    current_bonus = model.synergy_pages[1].synergy_rows[7].calculate_bonus(points[6])
+    result = model.min_bd_for_bonus(1, 7, current_bonus, 1)
+    assert result.reached
+    assert result.total_bd == 0
+    assert np.sum(result.bd_array) == 0
+    #a higher bonus still needs some BD
+    result = model.min_bd_for_bonus(1, 7, current_bonus * 2, 24)
+    assert result.reached
+    assert result.total_bd > 0
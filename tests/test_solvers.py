@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+
+from synergy_core import SynergyModel
+
+
+def get_states(seed:int, count:int = 24):
+    '''
+    Random models with brand new, mid game and mixed levels, random inputs and a row to optimize.
+    BD stay low enough for the greedy solvers to finish quickly
+    '''
+    rng = np.random.default_rng(seed)
+    for case in range(count):
+        if case % 3 == 0:
+            levels = [int(level) for level in rng.integers(1, 50, 7)]
+        elif case % 3 == 1:
+            levels = sorted((int(level) for level in rng.integers(100, 5000, 7)), reverse=True)
+        else:
+            levels = [int(level) for level in rng.integers(1, 100000, 7)]
+        inputs = {"Active Syn Pot": bool(rng.integers(2)), "Syn Power Perks Level": int(rng.integers(20)),
+                  "Max Stage": int(rng.integers(400, 1500))}
+        total_bd = int(rng.choice([40, 500, 3000]))
+        model = SynergyModel(levels, levels, levels, [0]*7, [0]*7, [0]*7, total_bd, inputs)
+        model.verbose = False
+        yield model, int(rng.integers(2, 8))
+
+
+def is_at_least(value:float, reference:float) -> bool:
+    return value >= reference - 1e-9 * abs(reference)
+
+
+def uses_available_bd(bd_array:np.ndarray, total_bd:int) -> bool:
+    return bool(np.all(bd_array >= 0) and np.sum(bd_array) <= total_bd)
+
+
+def test_bisect_is_at_least_as_good_as_greedy():
+    for model, row in get_states(0):
+        _, greedy_gains, _ = model.maximize_one_row(1, row, "greedy")
+        bd_array, gains_array, _ = model.maximize_one_row(1, row, "bisect")
+        assert is_at_least(gains_array[row-1], greedy_gains[row-1])
+        assert uses_available_bd(bd_array, model.total_bd)
+        assert np.all(gains_array[:row-1] >= 0)
+
+
+def test_waterfill_is_at_least_as_flat_as_greedy():
+    for model, row in get_states(1):
+        _, greedy_gains, _ = model.flat_up_to_row(1, row, solver="greedy")
+        bd_array, gains_array, _ = model.flat_up_to_row(1, row, solver="waterfill")
+        #flat means the lowest gains up to the row are as high as they can be
+        assert is_at_least(np.min(gains_array[:row]), np.min(greedy_gains[:row]))
+        assert uses_available_bd(bd_array, model.total_bd)
+
+
+def test_exact_is_never_worse(capsys):
+    for model, row in get_states(2):
+        results = model.compare_maximize_solvers(1, row)
+        assert set(results) == {"greedy", "bisect", "exact"}
+        assert is_at_least(results["exact"][0], results["greedy"][0])
+        assert is_at_least(results["exact"][0], results["bisect"][0])
+        bd_array, gains_array, _ = model.maximize_one_row(1, row, "exact")
+        assert uses_available_bd(bd_array, model.total_bd)
+        assert np.all(gains_array[:row-1] >= 0)
+    #compare_maximize_solvers warns about any solver that does worse than greedy
+    assert "Warning" not in capsys.readouterr().out
+
+
+def test_greedy_stops_at_time_budget():
+    #greedy takes several seconds on these, and only has a valid distribution at the very end
+    inputs = {"Active Syn Pot": False, "Syn Power Perks Level": 0, "Max Stage": 1076}
+    levels = [3, 10, 12, 36, 64, 88, 93]
+    model = SynergyModel(levels, levels, levels, [0]*7, [0]*7, [0]*7, 25009, inputs)
+    model.verbose = False
+    for optimization, args in [("maximize_one_row", (1, 7, "greedy")), ("flat_up_to_row", (1, 7, None, "greedy"))]:
+        start_time = time.time()
+        bd_array, gains_array, _ = getattr(model, optimization)(*args, time_budget=.2)
+        assert time.time() - start_time < 1
+        assert not model.last_result.converged
+        assert model.last_run_stats.converged is False
+        assert uses_available_bd(bd_array, model.total_bd)
+        assert np.all(gains_array >= 0)
+    assert model.deadline is None